@@ -0,0 +1,290 @@
+import asyncio
+import json
+import aiohttp
+
+from API.client import BASE_URL, quote_tag
+from API.keys import KeyPool
+from API.paging import apaginate
+from API.ratelimit import RateLimiter
+
+"""
+Asyncio counterpart of the API package.
+
+The coroutines here mirror the blocking wrappers (player, battle_logs, clan,
+members, leaderboard, ...) but share one aiohttp session, so hundreds of
+requests can be in flight at once. AsyncClient.concurrency bounds how many
+are actually sent at the same time.
+
+    async def main():
+        async with AsyncClient(concurrency=200) as client:
+            async for tag, logs in fetch_all(battle_logs, token, tags, client=client):
+                ...
+
+    asyncio.run(main())
+"""
+
+
+class AsyncClient:
+    """
+    Shared aiohttp session with a semaphore bounding in-flight requests.
+
+    Args:
+        base_url (str): API root, override to target a stub server.
+        concurrency (int): Maximum number of requests in flight at once.
+        limit_per_host (int): Maximum open connections to a single host.
+        timeout (float): Seconds to wait for a response.
+        limiter (RateLimiter, optional): Rate limiter, share one instance with the
+            blocking Client to draw from the same budget. Pass False to disable.
+        cache (ResponseCache, optional): On-disk response cache, off by default.
+    """
+
+    def __init__(self, base_url=BASE_URL, concurrency=100, limit_per_host=100, timeout=10, limiter=None, cache=None):
+        self.base_url = base_url.rstrip("/")
+        self.limiter = RateLimiter() if limiter is None else limiter
+        self.cache = cache
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def session(self):
+        # aiohttp sessions must be created inside the running event loop.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "Accept": "application/json",
+                    "Accept-Encoding": "gzip, deflate"
+                }
+            )
+        return self._session
+
+    async def get(self, path, token, params=None):
+        """
+        GET an API path (e.g. '/cards') and return the decoded json, or None on error.
+        """
+        pool = token if isinstance(token, KeyPool) else None
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+
+        # the cache is blocking sqlite, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.cache.lookup, path, params) if self.cache else None
+        if cached is not None and cached.fresh:
+            return cached.data()
+
+        attempt = 0
+        while True:
+            key = pool.key(self.limiter) if pool else token
+            if key is None:
+                print(f"Error fetching {path}: every API key in the pool has been retired")
+                return None
+            # Wait for the rate limiter before taking a slot so sleeping tasks
+            # don't hold the semaphore.
+            if self.limiter:
+                await self.limiter.acquire_async(key)
+            headers = {"authorization": f"Bearer {key}"}
+            if cached is not None:
+                headers.update(self.cache.conditional_headers(cached))
+            async with self.semaphore:
+                try:
+                    async with self.session().get(self.url(path), headers=headers, params=params) as response:
+                        if response.status == 403 and pool:
+                            pool.retire(key)
+                            continue
+                        if response.status == 429 and self.limiter:
+                            if pool:
+                                pool.throttled(key)
+                            if self.limiter.throttled(key, attempt, response.headers.get("Retry-After")):
+                                attempt += 1
+                                continue
+                        if response.status == 304 and cached is not None:
+                            await loop.run_in_executor(None, self.cache.revalidated, cached)
+                            data = cached.data()
+                        else:
+                            response.raise_for_status()  # Raise ClientResponseError for bad responses (4xx or 5xx)
+                            body = await response.text()
+                            data = json.loads(body)
+                            if self.cache:
+                                await loop.run_in_executor(None, self.cache.store, path, params, body, response.headers.get("ETag"))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Error fetching {path}: {e}")
+                    return None
+                except ValueError as e:  # Catch json decode errors.
+                    print(f"Error decoding json data: {e}")
+                    return None
+            if self.limiter:
+                self.limiter.success(key)
+            return data
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+_client = None
+
+
+def get_async_client():
+    """Return the process-wide async client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = AsyncClient()
+    return _client
+
+
+def set_async_client(client):
+    """Replace the process-wide async client."""
+    global _client
+    _client = client
+    return client
+
+
+async def _get(path, token, params=None, client=None):
+    return await (client or get_async_client()).get(path, token, params)
+
+
+async def player(token, playerTag, client=None):
+    return await _get(f"/players/{quote_tag(playerTag)}", token, client=client)
+
+
+async def battle_logs(token, playerTag, client=None):
+    return await _get(f"/players/{quote_tag(playerTag)}/battlelog", token, client=client)
+
+
+async def clan(token, clanTag, client=None):
+    return await _get(f"/clans/{quote_tag(clanTag)}", token, client=client)
+
+
+async def clans(token, name=None, locationId=None, minMembers=None, maxMembers=None, minScore=None, limit=None, after=None, before=None, client=None):
+    params = {
+        "name": name,
+        "locationId": locationId,
+        "minMembers": minMembers,
+        "maxMembers": maxMembers,
+        "minScore": minScore,
+        "limit": limit,
+        "after": after,
+        "before": before
+    }
+    return await _get("/clans", token, params, client=client)
+
+
+async def members(token, clanTag, limit=None, after=None, before=None, client=None):
+    return await _get(f"/clans/{quote_tag(clanTag)}/members", token, {"limit": limit, "after": after, "before": before}, client=client)
+
+
+async def war_log(token, clanTag, limit=None, after=None, before=None, client=None):
+    return await _get(f"/clans/{quote_tag(clanTag)}/warlog", token, {"limit": limit, "after": after, "before": before}, client=client)
+
+
+async def river_race_log(token, clanTag, limit=None, after=None, before=None, client=None):
+    return await _get(f"/clans/{quote_tag(clanTag)}/riverracelog", token, {"limit": limit, "after": after, "before": before}, client=client)
+
+
+async def current_war(token, clanTag, client=None):
+    return await _get(f"/clans/{quote_tag(clanTag)}/currentwar", token, client=client)
+
+
+async def current_river_race(token, clanTag, client=None):
+    return await _get(f"/clans/{quote_tag(clanTag)}/currentriverrace", token, client=client)
+
+
+async def leaderboard(token, leaderboardId, limit=None, after=None, before=None, client=None):
+    return await _get(f"/leaderboard/{leaderboardId}", token, {"limit": limit, "after": after, "before": before}, client=client)
+
+
+async def leaderboards(token, client=None):
+    return await _get("/leaderboards", token, client=client)
+
+
+async def cards(token, limit=None, after=None, before=None, client=None):
+    return await _get("/cards", token, {"limit": limit, "after": after, "before": before}, client=client)
+
+
+async def challenges(token, client=None):
+    return await _get("/challenges", token, client=client)
+
+
+async def tournaments(token, name=None, limit=None, after=None, before=None, client=None):
+    return await _get("/tournaments", token, {"name": name, "limit": limit, "after": after, "before": before}, client=client)
+
+
+async def tournament(token, tournamentTag, client=None):
+    return await _get(f"/tournaments/{quote_tag(tournamentTag)}", token, client=client)
+
+
+async def fetch_all(fn, token, keys, client=None, window=None):
+    """
+    Run fn(token, key) for every key and yield (key, result) as each one completes.
+
+    Only `window` tasks are scheduled at a time (default: twice the client's
+    concurrency) so a sweep over tens of thousands of tags doesn't create
+    every task up front.
+
+    Args:
+        fn (coroutine function): One of the wrappers above, e.g. battle_logs.
+        token (str): API token.
+        keys (iterable): Tags (or ids) to pass as the wrapper's second argument.
+        client (AsyncClient, optional): Defaults to the process-wide client.
+        window (int, optional): Maximum number of scheduled tasks.
+    """
+    client = client or get_async_client()
+    window = window or client.concurrency * 2
+
+    async def run(key):
+        return key, await fn(token, key, client=client)
+
+    keys = iter(keys)
+    pending = set()
+    try:
+        while True:
+            for key in keys:
+                pending.add(asyncio.ensure_future(run(key)))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def iter_clans(token, limit=None, client=None, **filters):
+    """Async iterator over every clan matching the search filters, see API.paging."""
+    return apaginate(clans, token, limit=limit, client=client, **filters)
+
+
+def iter_members(token, clanTag, limit=None, client=None):
+    return apaginate(members, token, clanTag, limit=limit, client=client)
+
+
+def iter_war_log(token, clanTag, limit=None, client=None):
+    return apaginate(war_log, token, clanTag, limit=limit, client=client)
+
+
+def iter_river_race_log(token, clanTag, limit=None, client=None):
+    return apaginate(river_race_log, token, clanTag, limit=limit, client=client)
+
+
+def iter_leaderboard(token, leaderboardId, limit=None, client=None):
+    return apaginate(leaderboard, token, leaderboardId, limit=limit, client=client)
+
+
+def iter_tournaments(token, name=None, limit=None, client=None):
+    return apaginate(tournaments, token, name=name, limit=limit, client=client)
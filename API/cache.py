@@ -0,0 +1,256 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+"""
+Persistent response cache for the API clients.
+
+Responses are stored in a SQLite file keyed by path + query parameters (the
+token is not part of the key, the data is the same for every key). Each
+endpoint has its own time-to-live; once an entry goes stale it is
+revalidated with If-None-Match when the API sent an ETag, so an unchanged
+response costs a 304 instead of a full download. The file is kept under
+max_bytes by evicting the least recently used entries.
+
+Lookups don't write: hit/miss counters and access times are kept in memory
+and flushed every flush_interval seconds (and with every store). Responses
+that are never fresh (TTL 0) are only kept when they came with an ETag,
+and lookups for them don't touch the file unless one was stored, so
+/battlelog polling costs the cache nothing.
+
+    cache = ResponseCache()
+    set_client(Client(cache=cache))
+    cards(token)            # network
+    cards(token)            # disk
+    print(cache.hit_ratio())
+"""
+
+CACHE_PATH = "data/cache/api.sqlite3"
+
+# Seconds a response is served without asking the API again, matched by the
+# longest path prefix. Anything not listed is only ever revalidated.
+DEFAULT_TTLS = {
+    "/cards": 24 * 60 * 60,
+    "/leaderboards": 24 * 60 * 60,
+    "/challenges": 60 * 60,
+    "/leaderboard/": 10 * 60,
+    "/clans": 10 * 60,
+    "/players/": 10 * 60,
+    "/tournaments": 10 * 60,
+}
+
+# Never serve these without asking, they change with every game played.
+NO_TTL_SUFFIXES = ("/battlelog", "/currentwar", "/currentriverrace")
+
+
+def cache_key(path, params=None):
+    if not params:
+        return path
+    params = sorted((k, v) for k, v in params.items() if v is not None)
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+class CacheEntry:
+    __slots__ = ("key", "body", "etag", "stored_at", "fresh")
+
+    def __init__(self, key, body, etag, stored_at, fresh):
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.stored_at = stored_at
+        self.fresh = fresh
+
+    def data(self):
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """
+    Args:
+        path (str): SQLite file to store responses in.
+        ttls (dict, optional): Path prefix -> seconds, merged over DEFAULT_TTLS.
+        max_bytes (int): Size cap for stored bodies, least recently used entries
+            are evicted beyond it.
+        flush_interval (float): Seconds between writes of counters and access times.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttls=None, max_bytes=256 * 1024 * 1024, flush_interval=30.0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.pending = Counter()  # counts not written to the stat table yet
+        self.accessed = {}  # key -> access time not written yet
+        self.flushed_at = time.monotonic()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS response (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS response_accessed_at ON response (accessed_at);
+            CREATE TABLE IF NOT EXISTS stat (
+                name TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM response").fetchone()[0]
+        # keys of never-fresh responses that can be revalidated; any other such lookup is a miss without a query
+        self.revalidatable = {
+            key for key, in self.conn.execute("SELECT key FROM response WHERE etag IS NOT NULL")
+            if not self.ttl(key.partition("?")[0])
+        }
+
+    def ttl(self, path):
+        if path.endswith(NO_TTL_SUFFIXES):
+            return 0
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        return self.ttls[max(matches, key=len)] if matches else 0
+
+    def _count(self, name, n=1):
+        self.counts[name] += n
+        self.pending[name] += n
+
+    def _flush(self):
+        """Write pending counters and access times (lock held, caller commits)."""
+        self.conn.executemany(
+            "INSERT INTO stat (name, count) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET count = count + excluded.count",
+            list(self.pending.items())
+        )
+        self.conn.executemany("UPDATE response SET accessed_at = ? WHERE key = ?", [(t, key) for key, t in self.accessed.items()])
+        self.pending.clear()
+        self.accessed.clear()
+        self.flushed_at = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+            self.conn.commit()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self.flushed_at >= self.flush_interval:
+            self._flush()
+            self.conn.commit()
+
+    def lookup(self, path, params=None):
+        """
+        Return the CacheEntry for a request, or None on a miss.
+
+        entry.fresh tells whether it can be served as is; a stale entry should
+        be revalidated with its etag (see conditional_headers).
+        """
+        key = cache_key(path, params)
+        now = time.time()
+        ttl = self.ttl(path)
+        with self.lock:
+            row = None
+            if ttl or key in self.revalidatable:
+                row = self.conn.execute("SELECT body, etag, stored_at FROM response WHERE key = ?", [key]).fetchone()
+            if row is None:
+                self._count("miss")
+                self._maybe_flush()
+                return None
+            body, etag, stored_at = row
+            fresh = now - stored_at < ttl
+            self._count("hit" if fresh else "stale")
+            self.accessed[key] = now
+            self._maybe_flush()
+        return CacheEntry(key, body, etag, stored_at, fresh)
+
+    def conditional_headers(self, entry):
+        if entry is not None and entry.etag:
+            return {"If-None-Match": entry.etag}
+        return {}
+
+    def revalidated(self, entry):
+        """The API answered 304 for a stale entry: restart its TTL and count it."""
+        with self.lock:
+            self.conn.execute("UPDATE response SET stored_at = ? WHERE key = ?", [time.time(), entry.key])
+            self._count("revalidated")
+            self.conn.commit()
+
+    def store(self, path, params, body, etag=None):
+        """Store a raw json response body. Never-fresh responses without an ETag are skipped."""
+        if not etag and not self.ttl(path):
+            return
+        key = cache_key(path, params)
+        size = len(body)
+        now = time.time()
+        with self.lock:
+            if not self.ttl(path):
+                self.revalidatable.add(key)
+            old = self.conn.execute("SELECT size FROM response WHERE key = ?", [key]).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response (key, body, etag, stored_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                [key, body, etag, now, now, size]
+            )
+            self.size += size - (old[0] if old else 0)
+            self._count("store")
+            self._flush()  # evicting needs the current access times
+            if self.size > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until we're 10% under the cap.
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute("SELECT key, size FROM response ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self.size <= target:
+                break
+            evicted.append((key,))
+            self.revalidatable.discard(key)
+            self.size -= size
+        self.conn.executemany("DELETE FROM response WHERE key = ?", evicted)
+        self._count("evict", len(evicted))
+
+    def stats(self, lifetime=False):
+        """
+        Hit/miss counters for this process, or summed over every run when lifetime=True.
+
+        hit: served from disk, stale: found but expired, revalidated: stale entry
+        confirmed by a 304, miss: not cached, store: responses written.
+        """
+        with self.lock:
+            if lifetime:
+                self._flush()
+                self.conn.commit()
+                return dict(self.conn.execute("SELECT name, count FROM stat").fetchall())
+            return dict(self.counts)
+
+    def hit_ratio(self, lifetime=False):
+        """Fraction of lookups answered without downloading the body again."""
+        stats = self.stats(lifetime)
+        served = stats.get("hit", 0) + stats.get("revalidated", 0)
+        lookups = stats.get("hit", 0) + stats.get("stale", 0) + stats.get("miss", 0)
+        return served / lookups if lookups else 0.0
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM response")
+            self.conn.commit()
+            self.size = 0
+            self.accessed.clear()
+            self.revalidatable.clear()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.conn.commit()
+            self.conn.close()
@@ -1,4 +1,4 @@
-import requests
+from API.client import get_client
 
 """
 Get current and upcoming challenges. 
@@ -68,19 +68,4 @@ Returns:
 }
 """
 def challenges(token):
-    url = f"https://api.clashroyale.com/v1/challenges"
-    headers = {
-    "Accept": "application/json",
-    "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
\ No newline at end of file
+    return get_client().get("/challenges", token)
@@ -1,4 +1,4 @@
-import requests
+from API.client import get_client, quote_tag
 
 """
 Retrieve the clan war log for a specific clan.
@@ -53,23 +53,8 @@ Returns:
         }
 """
 def war_log(token, clanTag, limit=None, after=None, before=None):
-    url = f"https://api.clashroyale.com/v1/clans/{clanTag}/warlog"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
+    return get_client().get(f"/clans/{quote_tag(clanTag)}/warlog", token, {"limit": limit, "after": after, "before": before})
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None    
-    
 """
 Search all clans by name and/or filtering the results using various criteria.
 
@@ -150,21 +135,17 @@ Returns:
     }
 """
 def clans(token, name=None, locationId=None, minMembers=None, maxMembers=None, minScore=None, limit=None, after=None, before=None):
-    url = f"https://api.clashroyale.com/v1/clans"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
+    params = {
+        "name": name,
+        "locationId": locationId,
+        "minMembers": minMembers,
+        "maxMembers": maxMembers,
+        "minScore": minScore,
+        "limit": limit,
+        "after": after,
+        "before": before
     }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
+    return get_client().get("/clans", token, params)
 
 """
 Retreive clans river race log
@@ -224,21 +205,7 @@ Returns:
 }
 """
 def river_race_log(token, clanTag, limit=None, after=None, before=None):
-    url = f"https://api.clashroyale.com/v1/clans/{clanTag}/riverracelog"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
+    return get_client().get(f"/clans/{quote_tag(clanTag)}/riverracelog", token, {"limit": limit, "after": after, "before": before})
 
 """
 Retrieve information about clan's current clan war
@@ -291,22 +258,8 @@ Returns:
 
 """
 def current_war(token, clanTag):
-    url = f"https://api.clashroyale.com/v1/clans/%23{clanTag}/currentwar"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
+    return get_client().get(f"/clans/{quote_tag(clanTag)}/currentwar", token)
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-    
 """
 Get information about a single clan by clan tag.
 Args:
@@ -368,21 +321,7 @@ Returns:
 }
 """
 def clan(token, clanTag):
-    url = f"https://api.clashroyale.com/v1/clans/{clanTag}"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
+    return get_client().get(f"/clans/{quote_tag(clanTag)}", token)
 
 """
 List clan members.
@@ -421,22 +360,8 @@ Returns:
 ]
 
 """
-def members(token, clanTag, limit, after, before):
-    url = f"https://api.clashroyale.com/v1/clans/{clanTag}/members"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
+def members(token, clanTag, limit=None, after=None, before=None):
+    return get_client().get(f"/clans/{quote_tag(clanTag)}/members", token, {"limit": limit, "after": after, "before": before})
 
 """
 Retrieve information about clan's current river race
@@ -524,20 +449,4 @@ Returns:
 }
 """
 def current_river_race(token, clanTag):
-    url = f"https://api.clashroyale.com/v1/clans/{clanTag}/currentriverrace"
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e: # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-
-
+    return get_client().get(f"/clans/{quote_tag(clanTag)}/currentriverrace", token)
@@ -0,0 +1,160 @@
+import json
+import requests
+from requests.adapters import HTTPAdapter
+
+from API.keys import KeyPool
+from API.ratelimit import RateLimiter
+
+"""
+Shared HTTP client for the Clash Royale API.
+
+Every wrapper in the API package routes its request through one Client so
+that connections to api.clashroyale.com are kept alive and reused instead of
+paying a fresh TCP+TLS handshake per call.
+
+    client = Client(pool_maxsize=32)
+    set_client(client)
+    player(token, "#820GP2VQ")  # now uses the pooled session
+
+Point base_url at a local stub server to exercise the wrappers offline:
+
+    set_client(Client(base_url="http://127.0.0.1:8000/v1"))
+"""
+
+BASE_URL = "https://api.clashroyale.com/v1"
+
+
+def quote_tag(tag):
+    """
+    Format a player/clan/tournament tag for use in a URL path.
+
+    Accepts tags with or without the leading '#', e.g. '#820GP2VQ' or '820GP2VQ'.
+    """
+    return f"%23{tag.replace('#', '')}"
+
+
+class Client:
+    """
+    Keep-alive HTTP client used by all the API wrappers.
+
+    Args:
+        base_url (str): API root, override to target a stub server.
+        pool_connections (int): Number of per-host connection pools to keep.
+        pool_maxsize (int): Maximum connections kept open to a single host.
+        pool_block (bool): Block when pool_maxsize connections to a host are busy
+            instead of opening extra throwaway connections, making pool_maxsize
+            a hard per-host limit.
+        timeout (float): Seconds to wait for a response.
+        limiter (RateLimiter, optional): Shared rate limiter, a default one is
+            created if omitted. Pass False to disable rate limiting.
+        cache (ResponseCache, optional): On-disk response cache, off by default.
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_connections=4, pool_maxsize=16, pool_block=False, timeout=10, limiter=None, cache=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limiter = RateLimiter() if limiter is None else limiter
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate"
+        })
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def get(self, path, token, params=None):
+        """
+        GET an API path (e.g. '/cards') and return the decoded json, or None on error.
+
+        Args:
+            path (str): Path below the API root.
+            token (str or KeyPool): API token, or a pool of tokens to spread requests over.
+            params (dict, optional): Query parameters, None values are dropped.
+        """
+        pool = token if isinstance(token, KeyPool) else None
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+
+        cached = self.cache.lookup(path, params) if self.cache else None
+        if cached is not None and cached.fresh:
+            return cached.data()
+
+        try:
+            attempt = 0
+            while True:
+                key = pool.key(self.limiter) if pool else token
+                if key is None:
+                    print(f"Error fetching {path}: every API key in the pool has been retired")
+                    return None
+                if self.limiter:
+                    self.limiter.acquire(key)
+                headers = {"authorization": f"Bearer {key}"}
+                if cached is not None:
+                    headers.update(self.cache.conditional_headers(cached))
+                response = self.session.get(self.url(path), headers=headers, params=params, timeout=self.timeout)
+                if response.status_code == 403 and pool:
+                    pool.retire(key)
+                    continue
+                if response.status_code != 429 or not self.limiter:
+                    break
+                if pool:
+                    pool.throttled(key)
+                if not self.limiter.throttled(key, attempt, response.headers.get("Retry-After")):
+                    break
+                attempt += 1
+            if self.limiter and response.ok:
+                self.limiter.success(key)
+            if response.status_code == 304 and cached is not None:
+                self.cache.revalidated(cached)
+                return cached.data()
+            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+            if self.cache:
+                data = json.loads(response.text)
+                self.cache.store(path, params, response.text, response.headers.get("ETag"))
+                return data
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {path}: {e}")
+            return None
+        except ValueError as e:  # Catch json decode errors.
+            print(f"Error decoding json data: {e}")
+            return None
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_client = None
+
+
+def get_client():
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = Client()
+    return _client
+
+
+def set_client(client):
+    """Replace the process-wide client (e.g. with a bigger pool or a stub base_url)."""
+    global _client
+    if _client is not None and _client is not client:
+        _client.close()
+    _client = client
+    return client
@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import Counter
+
+"""
+Pool of API tokens for spreading requests over several developer keys.
+
+A KeyPool can be passed anywhere the wrappers expect a token:
+
+    token = KeyPool.load()
+    battle_logs(token, "#820GP2VQ")
+
+Each request is sent with the key that currently has the most rate-limit
+budget left, so adding keys scales throughput roughly linearly. Keys that
+come back 403 (revoked, or not whitelisted for this IP) are retired.
+"""
+
+TOKENS_ENV = "CLASH_ROYALE_TOKENS"
+TOKENS_PATH = "data/tokens.txt"
+
+
+class KeyPool:
+    """
+    Args:
+        tokens (list): API tokens (JWTs).
+    """
+
+    def __init__(self, tokens):
+        self.keys = list(dict.fromkeys(t.strip() for t in tokens if t.strip()))
+        self.retired = set()
+        self.stats = {key: Counter() for key in self.keys}
+        self.lock = threading.Lock()
+        self._next = 0
+
+    @classmethod
+    def load(cls, path=TOKENS_PATH, env=TOKENS_ENV):
+        """
+        Build a pool from the CLASH_ROYALE_TOKENS environment variable
+        (comma or whitespace separated) and/or a file with one token per line.
+        """
+        tokens = os.environ.get(env, "").replace(",", " ").split()
+        if path and os.path.exists(path):
+            with open(path, 'r') as file:
+                tokens += [line.strip() for line in file if line.strip() and not line.startswith("#")]
+        if not tokens:
+            raise ValueError(f"No API tokens found, set {env} or add them to {path}")
+        return cls(tokens)
+
+    def active(self):
+        with self.lock:
+            return [key for key in self.keys if key not in self.retired]
+
+    def key(self, limiter=None):
+        """
+        Pick the key to use for the next request, or None if every key is retired.
+
+        With a limiter, the key whose bucket has the most tokens available is
+        chosen; ties (and pools without a limiter) go round-robin.
+        """
+        with self.lock:
+            active = [key for key in self.keys if key not in self.retired]
+            if not active:
+                return None
+            start = self._next % len(active)
+            self._next += 1
+            ordered = active[start:] + active[:start]
+            if limiter:
+                key = max(ordered, key=lambda k: limiter.bucket(k).available())
+            else:
+                key = ordered[0]
+            self.stats[key]["requests"] += 1
+            return key
+
+    def throttled(self, key):
+        with self.lock:
+            self.stats[key]["throttled"] += 1
+
+    def retire(self, key):
+        """Stop using a key, e.g. after it returned 403."""
+        with self.lock:
+            self.retired.add(key)
+            self.stats[key]["forbidden"] += 1
+        print(f"Retiring API key ending in ...{key[-6:]} ({len(self.keys) - len(self.retired)} left)")
+
+    def counters(self):
+        """Per-key request/throttled/forbidden counts, keyed by the last 6 characters of each key."""
+        with self.lock:
+            return {f"...{key[-6:]}": dict(counts) for key, counts in self.stats.items()}
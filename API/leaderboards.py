@@ -1,4 +1,4 @@
-import requests
+from API.client import get_client
 
 """
 Get players on a specific leaderboard
@@ -21,22 +21,7 @@ Returns:
 ]
 """
 def leaderboard(token, leaderboardId, limit=None, after=None, before=None):
-    url = f"https://api.clashroyale.com/v1/leaderboard/{leaderboardId}"
-    headers = {
-    "Accept": "application/json",
-    "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
+    return get_client().get(f"/leaderboard/{leaderboardId}", token, {"limit": limit, "after": after, "before": before})
 
 """
 List leaderboards for different trophy roads
@@ -55,19 +40,4 @@ Returns:
 ]
 """
 def leaderboards(token):
-    url = f"https://api.clashroyale.com/v1/leaderboards"
-    headers = {
-    "Accept": "application/json",
-    "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
\ No newline at end of file
+    return get_client().get("/leaderboards", token)
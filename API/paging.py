@@ -0,0 +1,167 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from API.clans import clans, members, war_log, river_race_log
+from API.leaderboards import leaderboard
+from API.tournaments import tournaments
+
+"""
+Lazy iterators over the paged endpoints.
+
+The paged wrappers (clans, members, war_log, river_race_log, leaderboard,
+tournaments) return one page of "items" plus a "paging.cursors.after"
+cursor. paginate() follows that cursor and yields items one at a time,
+fetching the next page in the background while the caller is still working
+through the current one, so only about two pages are ever held in memory.
+
+    for entry in iter_leaderboard(token, 170000005, limit=5000):
+        ...
+
+apaginate() is the asyncio version for the coroutines in API.aio.
+
+The wrappers return None when a request fails (after printing the error).
+Both iterators raise PageError then, so a failed page isn't mistaken for
+the end of the listing.
+"""
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class PageError(Exception):
+    """A page request failed partway through a paginated listing."""
+
+
+def _page_items(page, cursor=None):
+    """Return (items, next cursor) for a page, tolerating list-only responses."""
+    if page is None:
+        raise PageError(f"Request for the page after {cursor} failed" if cursor else "Request for the first page failed")
+    if isinstance(page, list):
+        return page, None
+    return page.get("items", []), page.get("paging", {}).get("cursors", {}).get("after")
+
+
+def paginate(fn, token, *args, limit=None, page_size=DEFAULT_PAGE_SIZE, after=None, prefetch=True, on_page=None, **kwargs):
+    """
+    Yield every item from a paged endpoint, following the `after` cursor.
+
+    Args:
+        fn (function): A paged wrapper taking limit/after keyword arguments, e.g. members.
+        token (str or KeyPool): API token.
+        *args: Positional arguments for fn after the token (e.g. the clan tag).
+        limit (int, optional): Stop after this many items. Defaults to None (everything).
+        page_size (int): Items requested per page.
+        after (str, optional): Cursor to start from.
+        prefetch (bool): Fetch the next page in a background thread while the
+            current one is being consumed.
+        on_page (function, optional): Called with (cursor, items yielded so far)
+            once the caller has consumed a page and moves on to the next. Save
+            the cursor and pass it back as after= to resume from that page.
+        **kwargs: Extra keyword arguments for fn (e.g. name for clans).
+
+    Raises:
+        PageError: When fn returns None for a page.
+    """
+    def fetch(cursor, remaining):
+        size = page_size if remaining is None else min(page_size, remaining)
+        return fn(token, *args, limit=size, after=cursor, **kwargs)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        yielded = 0
+        requested = after
+        page = fetch(after, limit)
+        while True:
+            items, cursor = _page_items(page, requested)
+            if limit is not None:
+                items = items[:limit - yielded]
+            remaining = None if limit is None else limit - yielded - len(items)
+
+            upcoming = None
+            if cursor and items and remaining != 0:
+                if executor:
+                    upcoming = executor.submit(fetch, cursor, remaining)
+                else:
+                    upcoming = cursor
+
+            for item in items:
+                yield item
+            yielded += len(items)
+
+            if upcoming is None:
+                return
+            if on_page:
+                on_page(cursor, yielded)
+            requested = cursor
+            page = upcoming.result() if executor else fetch(upcoming, remaining)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def apaginate(fn, token, *args, limit=None, page_size=DEFAULT_PAGE_SIZE, after=None, on_page=None, **kwargs):
+    """
+    Async iterator version of paginate() for the coroutines in API.aio.
+
+        async for member in apaginate(aio.members, token, "#ABC123"):
+            ...
+
+    Wrap it in contextlib.aclosing() when breaking out early so the prefetch
+    task is cancelled before the client is closed.
+    """
+    def fetch(cursor, remaining):
+        size = page_size if remaining is None else min(page_size, remaining)
+        return asyncio.ensure_future(fn(token, *args, limit=size, after=cursor, **kwargs))
+
+    upcoming = None
+    try:
+        yielded = 0
+        requested = after
+        page = await fetch(after, limit)
+        while True:
+            items, cursor = _page_items(page, requested)
+            if limit is not None:
+                items = items[:limit - yielded]
+            remaining = None if limit is None else limit - yielded - len(items)
+
+            upcoming = None
+            if cursor and items and remaining != 0:
+                upcoming = fetch(cursor, remaining)
+
+            for item in items:
+                yield item
+            yielded += len(items)
+
+            if upcoming is None:
+                return
+            if on_page:
+                on_page(cursor, yielded)
+            requested = cursor
+            page = await upcoming
+    finally:
+        if upcoming is not None and not upcoming.done():
+            upcoming.cancel()
+
+
+def iter_clans(token, limit=None, **filters):
+    """Search clans (name, locationId, minMembers, maxMembers, minScore) and yield every match."""
+    return paginate(clans, token, limit=limit, **filters)
+
+
+def iter_members(token, clanTag, limit=None, after=None, on_page=None):
+    return paginate(members, token, clanTag, limit=limit, after=after, on_page=on_page)
+
+
+def iter_war_log(token, clanTag, limit=None):
+    return paginate(war_log, token, clanTag, limit=limit)
+
+
+def iter_river_race_log(token, clanTag, limit=None):
+    return paginate(river_race_log, token, clanTag, limit=limit)
+
+
+def iter_leaderboard(token, leaderboardId, limit=None, after=None, on_page=None):
+    return paginate(leaderboard, token, leaderboardId, limit=limit, after=after, on_page=on_page)
+
+
+def iter_tournaments(token, name=None, limit=None):
+    return paginate(tournaments, token, name=name, limit=limit)
@@ -1,4 +1,4 @@
-import requests
+from API.client import get_client, quote_tag
 
 """
 Get information about a single player by player tag.
@@ -207,22 +207,7 @@ Returns:
 }
 """
 def player(token, playerTag):
-    url = f"https://api.clashroyale.com/v1/players/%23{playerTag.replace('#', '')}"  # Remove the '#' from the tag in case it is included.
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
+    return get_client().get(f"/players/{quote_tag(playerTag)}", token)
 
 """
 Get the battle logs of a player by player tag.
@@ -458,19 +443,4 @@ Returns:
 ]
 """
 def battle_logs(token, playerTag):
-    url = f"https://api.clashroyale.com/v1/players/%23{playerTag.replace('#', '')}/battlelog"  # Remove the '#' from the tag in case it is included.
-    headers = {
-        "Accept": "application/json",
-        "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
\ No newline at end of file
+    return get_client().get(f"/players/{quote_tag(playerTag)}/battlelog", token)
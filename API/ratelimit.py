@@ -0,0 +1,185 @@
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+"""
+Client-side rate limiting for the Clash Royale API.
+
+One RateLimiter keeps a token bucket per API token and is safe to share
+between threads (Client) and asyncio tasks (AsyncClient), so every caller
+draws from the same budget. When the API still answers 429 the bucket is
+paused for Retry-After (or an exponential backoff) and its rate is lowered,
+then crept back up on every successful response.
+
+    limiter = RateLimiter(rate=10)
+    set_client(Client(limiter=limiter))
+    ...
+    print(limiter.counters())  # {'requests': ..., 'throttled': ..., 'retried': ...}
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding at most `capacity`.
+
+    Acquiring reserves a token immediately (the balance may go negative) and
+    returns how long the caller has to wait for it, so the lock is only held
+    for the bookkeeping and never while sleeping.
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 10
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, n=1):
+        """Take n tokens and return the number of seconds to wait before using them."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= n
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def available(self):
+        """Tokens that could be taken right now without waiting (negative while paused or in debt)."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.paused_until > now:
+                return -(self.paused_until - now) * self.rate
+            return self.tokens
+
+    def acquire(self, n=1):
+        wait = self.reserve(n)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, n=1):
+        wait = self.reserve(n)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds` and halve the refill rate."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0)
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        """Creep the refill rate back towards max_rate after a successful request."""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta seconds or an HTTP date) into seconds, or None.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """
+    Per-token rate limits plus the retry policy for throttled (429) responses.
+
+    Args:
+        rate (float): Requests per second allowed for each token.
+        capacity (float, optional): Burst size, defaults to one second of requests.
+        max_retries (int): How many times a throttled request is retried.
+        backoff (float): Base delay in seconds when no Retry-After is given.
+        max_backoff (float): Upper bound for the exponential backoff.
+    """
+
+    def __init__(self, rate=10, capacity=None, max_retries=5, backoff=1.0, max_backoff=60.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.buckets = {}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def bucket(self, token):
+        with self.lock:
+            bucket = self.buckets.get(token)
+            if bucket is None:
+                bucket = self.buckets[token] = TokenBucket(self.rate, self.capacity)
+            return bucket
+
+    def _count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def acquire(self, token):
+        """Block until `token` may send another request."""
+        waited = self.bucket(token).acquire()
+        self._count("requests")
+        if waited > 0:
+            self._count("delayed")
+        return waited
+
+    async def acquire_async(self, token):
+        waited = await self.bucket(token).acquire_async()
+        self._count("requests")
+        if waited > 0:
+            self._count("delayed")
+        return waited
+
+    def throttled(self, token, attempt, retry_after=None):
+        """
+        Record a 429 for `token` and pause its bucket.
+
+        Returns True if the request should be retried, False once max_retries
+        has been used up.
+        """
+        self._count("throttled")
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        self.bucket(token).pause(delay)
+        if attempt >= self.max_retries:
+            self._count("dropped")
+            return False
+        self._count("retried")
+        return True
+
+    def success(self, token):
+        self.bucket(token).recover()
+
+    def counters(self):
+        """Snapshot of requests/delayed/throttled/retried/dropped counts."""
+        with self.lock:
+            return dict(self.stats)
@@ -1,4 +1,4 @@
-import requests
+from API.client import get_client, quote_tag
 
 """
 Search all tournaments by name
@@ -35,22 +35,7 @@ Result:
 ]
 """
 def tournaments(token, name=None, limit=None, after=None, before=None):
-    url = f"https://api.clashroyale.com/v1/tornaments"
-    headers = {
-    "Accept": "application/json",
-    "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
+    return get_client().get("/tournaments", token, {"name": name, "limit": limit, "after": after, "before": before})
 
 """
 Get information about a single tournament by a tournament tag.
@@ -103,20 +88,4 @@ Result:
 }
 """
 def tournament(token, tournamentTag):
-    url = f"https://api.clashroyale.com/v1/tournaments/%23{tournamentTag.replace('#', '')}"
-    headers = {
-    "Accept": "application/json",
-    "authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching player data: {e}")
-        return None
-    except ValueError as e:  # Catch json decode errors.
-        print(f"Error decoding json data: {e}")
-        return None
-
+    return get_client().get(f"/tournaments/{quote_tag(tournamentTag)}", token)
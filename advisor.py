@@ -0,0 +1,324 @@
+import os
+import queue
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+from data import connection
+from mining import ItemsetMiner, card_slug, echo_path, me_path, read_picks
+from predictor import read_ratings
+from recognition import CardRecognizer, base_card, split_slots
+from storage import get_backend
+
+"""
+Real-time triple draft advisor.
+
+img_processing.py grabs the card strips when space is pressed. The advisor
+goes from the same keypress to a printed recommendation. Each stage runs
+on its own thread and hands work to the next through a queue:
+
+    keyboard -> presses -> capture -> frames -> recognize -> offers -> score -> print
+
+Capturing only grabs pixels, so a keypress is never lost while an earlier
+frame is still being recognized or scored. Slow stages just queue up.
+
+Synergy is scored against the cards actually drafted, which the advisor
+can't see: press 1, 2 or 3 for the card taken from the last offer (left to
+right), or backspace to take back the last pick. Picks travel through the
+same queues as captures, so they apply to the offer captured just before.
+Without them every offer is scored on rating alone.
+
+Cards are recognized with the precomputed template index in recognition.py
+(TemplateRecognizer, one cv.matchTemplate per card, is kept as the baseline
+it is benchmarked against). Offers are scored by their
+tripple_draft_stats rating plus their synergy with the cards drafted so
+far, which is how often they were picked together in the recorded drafts.
+
+    python advisor.py [opponent tag]
+"""
+
+templates_path = "data/cards/templates"
+DRAFT_ROUNDS = 8
+
+
+def load_ratings():
+    """{card slug: rating} from tripple_draft_stats, or from card_data.csv if the database is unavailable."""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(get_backend().sql(
+                "SELECT c.card_name, s.rating FROM tripple_draft_stats s JOIN card c ON c.card_id = s.card_id"
+            ))
+            ratings = {card_slug(name): rating for name, rating in cursor.fetchall()}
+            cursor.close()
+        if ratings:
+            return ratings
+    except Exception as e:
+        print(f"Error loading ratings from the database: {e}")
+    return read_ratings()
+
+
+class TemplateRecognizer:
+    """
+    Baseline recognizer: every slot is compared against every card template
+    with cv.matchTemplate.
+
+    Args:
+        path (str): Directory of grayscale card images named '<slug>.png'.
+        slots (int): Cards per strip.
+        size (tuple): (width, height) templates and slots are scaled to before matching.
+    """
+
+    def __init__(self, path=templates_path, slots=3, size=(48, 60)):
+        self.slots = slots
+        self.size = size
+        self.templates = {}
+        for name in sorted(os.listdir(path)):
+            image = cv.imread(os.path.join(path, name), cv.IMREAD_GRAYSCALE)
+            if image is not None:
+                # scaled once here instead of to every slot's size on every match
+                self.templates[os.path.splitext(name)[0]] = cv.resize(image, size, interpolation=cv.INTER_AREA)
+
+    def match(self, image):
+        """(best card slug, score) for one card image."""
+        image = cv.resize(image, self.size, interpolation=cv.INTER_AREA)
+        best, best_score = None, -1.0
+        for card, template in self.templates.items():
+            score = float(cv.matchTemplate(image, template, cv.TM_CCOEFF_NORMED).max())
+            if score > best_score:
+                best, best_score = card, score
+        return best, best_score
+
+    def recognize(self, strip):
+        return [base_card(self.match(slot)[0]) for slot in split_slots(strip, self.slots)]
+
+
+class Scorer:
+    """
+    Args:
+        ratings (dict): {card slug: rating}.
+        miner (ItemsetMiner): Recorded pick drafts, for synergy.
+        synergy_weight (float): Weight of synergy against rating.
+    """
+
+    def __init__(self, ratings, miner, synergy_weight=0.2):
+        self.ratings = ratings
+        self.miner = miner
+        self.synergy_weight = synergy_weight
+
+    @classmethod
+    def from_files(cls, pick_files=(me_path, echo_path), **kwargs):
+        miner = ItemsetMiner()
+        for path in pick_files:
+            if os.path.exists(path):
+                miner.update(read_picks(path))
+        return cls(load_ratings(), miner, **kwargs)
+
+    def synergy(self, card, drafted):
+        """Mean lift of card with each drafted card (0 when they're independent or unseen)."""
+        if not drafted or not self.miner.transactions:
+            return 0.0
+        total = self.miner.transactions
+        single = self.miner.support([card])
+        lifts = []
+        for other in drafted:
+            both = self.miner.support([card, other])
+            expected = single * self.miner.support([other]) / total
+            lifts.append(np.log((both + 1) / (expected + 1)))
+        return float(np.mean(lifts))
+
+    def score(self, offer, drafted):
+        """[(card, score, rating, synergy)], best first. Unrecognized (None) slots are left out."""
+        scored = []
+        for card in offer:
+            if card is None:
+                continue
+            rating = self.ratings.get(card, 0.0)
+            synergy = self.synergy(card, drafted)
+            scored.append((card, rating + self.synergy_weight * synergy, rating, synergy))
+        scored.sort(key=lambda entry: -entry[1])
+        return scored
+
+
+class Advisor:
+    """
+    Args:
+        recognizer: Object with recognize(strip) -> list of card slugs.
+        scorer (Scorer): Offer scoring.
+        capture (function): () -> (player strip, opponent strip), or None when
+            there is nothing to capture (a replay has run out).
+        opponent_tag (str, optional): With a predictor, also print the opponent's likely pick.
+        predictor (Predictor, optional): See predictor.py.
+    """
+
+    def __init__(self, recognizer, scorer, capture, opponent_tag=None, predictor=None):
+        self.recognizer = recognizer
+        self.scorer = scorer
+        self.capture = capture
+        self.opponent_tag = opponent_tag
+        self.predictor = predictor
+        self.drafted = []
+        self.offer = None  # last recognized offer, in slot order
+
+        self.presses = queue.Queue()
+        self.frames = queue.Queue()
+        self.offers = queue.Queue()
+        self.threads = []
+        self.listener = None
+
+    def press(self):
+        """Register a keypress; safe to call from the keyboard listener."""
+        self.presses.put(time.perf_counter())
+
+    def pick(self, slot):
+        """Record that the card in slot (0-2) of the last offer was taken; safe to call from any thread."""
+        self.presses.put(("pick", slot))
+
+    def undo(self):
+        """Take back the last recorded pick."""
+        self.presses.put(("pick", None))
+
+    def on_press(self, key):
+        from pynput import keyboard
+        if key == keyboard.Key.space:
+            self.press()
+        elif key == keyboard.Key.backspace:
+            self.undo()
+        elif getattr(key, "char", None) in ("1", "2", "3"):
+            self.pick(int(key.char) - 1)
+
+    def _capture_loop(self):
+        while True:
+            pressed = self.presses.get()
+            if pressed is None:
+                self.frames.put(None)
+                return
+            if isinstance(pressed, tuple):  # a pick, passed on in order
+                self.frames.put(pressed)
+                continue
+            try:
+                strips = self.capture()
+            except Exception as e:
+                print(f"Error capturing the screen: {e}")
+                continue
+            if strips is None:
+                print("Nothing to capture (the replay has run out), skipping")
+                continue
+            player, opponent = strips
+            self.frames.put((pressed, player, opponent))
+
+    def _recognize_loop(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                self.offers.put(None)
+                return
+            if frame[0] == "pick":
+                self.offers.put(frame)
+                continue
+            pressed, player, opponent = frame
+            try:
+                offer = self.recognizer.recognize(player)
+                opponent_offer = self.recognizer.recognize(opponent) if opponent is not None else None
+            except Exception as e:
+                print(f"Error recognizing cards: {e}")
+                continue
+            self.offers.put((pressed, offer, opponent_offer))
+
+    def _score_loop(self):
+        while True:
+            item = self.offers.get()
+            if item is None:
+                return
+            if item[0] == "pick":
+                self.take(item[1])
+                continue
+            pressed, offer, opponent_offer = item
+            try:
+                self.recommend(pressed, offer, opponent_offer)
+            except Exception as e:
+                print(f"Error scoring the offer: {e}")
+
+    def take(self, slot):
+        """Add the card in slot of the last offer to the drafted cards (None removes the last one)."""
+        if slot is None:
+            if self.drafted:
+                print(f"Took back {self.drafted.pop()}")
+            return
+        card = self.offer[slot] if self.offer and slot < len(self.offer) else None
+        if card is None:
+            print(f"No recognized card in slot {slot + 1} of the last offer")
+            return
+        self.drafted.append(card)
+        print(f"Drafted {card} ({len(self.drafted)}/{DRAFT_ROUNDS})")
+        self.offer = None
+        if len(self.drafted) >= DRAFT_ROUNDS:
+            print("Draft complete, starting over")
+            self.drafted = []
+
+    def recommend(self, pressed, offer, opponent_offer=None):
+        self.offer = offer
+        scored = self.scorer.score(offer, self.drafted)
+        elapsed = (time.perf_counter() - pressed) * 1000
+        unknown = offer.count(None)
+        if not scored:
+            print(f"Round {len(self.drafted) + 1}: no card recognized, capture again  ({elapsed:.0f} ms)")
+            return scored
+        best = scored[0][0]
+        print(f"Round {len(self.drafted) + 1}: pick {best}  ({elapsed:.0f} ms)")
+        for card, score, rating, synergy in scored:
+            print(f"    {card:20} {score:6.3f}  rating {rating:.3f}  synergy {synergy:+.3f}")
+        if unknown:
+            print(f"    {unknown} card(s) not recognized")
+        if opponent_offer and any(card is not None for card in opponent_offer) and self.predictor is not None:
+            predicted = self.predictor.predict(self.opponent_tag, opponent_offer)
+            print("    opponent likely takes " + ", ".join(f"{card} {p:.0%}" for card, p in predicted))
+        return scored
+
+    def start(self, listen=True):
+        for target in (self._capture_loop, self._recognize_loop, self._score_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        if listen:
+            from pynput import keyboard
+            self.listener = keyboard.Listener(on_press=self.on_press)
+            self.listener.start()
+
+    def stop(self):
+        """Finish the queued work, then stop every stage."""
+        if self.listener is not None:
+            self.listener.stop()
+        self.presses.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+
+def screen_capture():
+    from img_processing import get_capture
+    regions = get_capture().grab()
+    if regions is None:
+        return None
+    return regions["player"], regions["opponent"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    predictor = None
+    opponent_tag = sys.argv[1] if len(sys.argv) > 1 else None
+    if opponent_tag:
+        from predictor import Predictor
+        predictor = Predictor()
+
+    advisor = Advisor(CardRecognizer.load(), Scorer.from_files(), screen_capture, opponent_tag, predictor)
+    advisor.start()
+    print("Press space when the cards are offered, 1-3 for the card you took (backspace undoes), Ctrl-C to quit")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        advisor.stop()
@@ -0,0 +1,134 @@
+import hashlib
+
+from bloom import BloomFilter
+from data import insert_many
+from storage import get_backend
+
+"""
+Normalized battle store with deduplication.
+
+When both players of a battle are crawled the same game shows up in two
+battle logs. Each battle gets a canonical fingerprint, battleTime plus the
+sorted player tags, which is the same from either side. Its 60-bit hash is
+the battle_id, so child rows can be written without a round trip to fetch
+generated ids.
+
+Each battle is stored once across three tables:
+
+    battle       (battle_id, battle_time, game_mode, type)
+    participant  (battle_id, player_tag, team, crowns, trophies, trophy_change)
+    deck_card    (battle_id, player_tag, slot, card_id, level, evolution_level)
+
+A bloom filter of ingested battle ids rejects most duplicates in memory.
+Only possible duplicates are checked against the database.
+
+    store = BattleStore()
+    store.ingest(battle_logs(token, tag))
+"""
+
+
+def fingerprint(battle):
+    """'20250408T201512.000Z|#ABC|#XYZ' - identical whichever player's log it came from."""
+    tags = sorted(p["tag"] for side in ("team", "opponent") for p in battle.get(side, []))
+    return "|".join([battle["battleTime"]] + tags)
+
+
+def battle_id(battle):
+    """60-bit integer id derived from the fingerprint (fits a signed BIGINT)."""
+    digest = hashlib.blake2b(fingerprint(battle).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 4
+
+
+def normalize(battle):
+    """
+    Split one battle-log entry into (battle row, participant rows, deck_card rows).
+
+    Team 0 is the side whose log the battle came from, team 1 the opponents.
+    """
+    bid = battle_id(battle)
+    battle_row = (bid, battle["battleTime"], battle.get("gameMode", {}).get("name"), battle.get("type"))
+    participants = []
+    deck_cards = []
+    for team, side in enumerate(("team", "opponent")):
+        for player in battle.get(side, []):
+            tag = player["tag"]
+            participants.append((
+                bid, tag, team, player.get("crowns"),
+                player.get("startingTrophies"), player.get("trophyChange")
+            ))
+            for slot, card in enumerate(player.get("cards", [])):
+                deck_cards.append((bid, tag, slot, card["id"], card.get("level"), card.get("evolutionLevel", 0)))
+    return battle_row, participants, deck_cards
+
+
+class BattleStore:
+    """
+    Args:
+        backend (Backend, optional): Storage backend, defaults to the configured one.
+        capacity (int): Battles the bloom filter is sized for.
+        batch_size (int): Rows per executemany batch.
+    """
+
+    def __init__(self, backend=None, capacity=10_000_000, batch_size=1000):
+        self.backend = backend or get_backend()
+        self.batch_size = batch_size
+        self.seen = BloomFilter(capacity)
+        self.stats = {"ingested": 0, "duplicates": 0}
+
+        self.backend.create_schema()
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT battle_id FROM battle")
+            for (bid,) in cursor:
+                self.seen.add(bid.to_bytes(8, "big"))
+            cursor.close()
+
+    def _stored(self, cursor, ids):
+        """Which of ids are already in the battle table."""
+        stored = set()
+        ids = list(ids)
+        for i in range(0, len(ids), self.batch_size):
+            chunk = ids[i:i + self.batch_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(self.backend.sql(f"SELECT battle_id FROM battle WHERE battle_id IN ({placeholders})"), chunk)
+            stored.update(row[0] for row in cursor.fetchall())
+        return stored
+
+    def ingest(self, battles):
+        """
+        Store every battle that isn't already stored, in one transaction.
+        Returns the number of new battles.
+        """
+        new = {}
+        maybe = {}
+        for battle in battles:
+            bid = battle_id(battle)
+            if bid in new or bid in maybe:
+                self.stats["duplicates"] += 1
+            elif self.seen.add(bid.to_bytes(8, "big")):
+                new[bid] = battle
+            else:
+                maybe[bid] = battle  # bloom says seen, could be a false positive
+
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            if maybe:
+                stored = self._stored(cursor, maybe)
+                self.stats["duplicates"] += len(stored)
+                new.update((bid, battle) for bid, battle in maybe.items() if bid not in stored)
+
+            battle_rows, participant_rows, deck_rows = [], [], []
+            for battle in new.values():
+                battle_row, participants, deck_cards = normalize(battle)
+                battle_rows.append(battle_row)
+                participant_rows += participants
+                deck_rows += deck_cards
+
+            sql = self.backend.sql
+            insert_many(cursor, sql("INSERT IGNORE INTO battle (battle_id, battle_time, game_mode, type) VALUES (%s, %s, %s, %s)"), battle_rows, self.batch_size)
+            insert_many(cursor, sql("INSERT IGNORE INTO participant (battle_id, player_tag, team, crowns, trophies, trophy_change) VALUES (%s, %s, %s, %s, %s, %s)"), participant_rows, self.batch_size)
+            insert_many(cursor, sql("INSERT IGNORE INTO deck_card (battle_id, player_tag, slot, card_id, level, evolution_level) VALUES (%s, %s, %s, %s, %s, %s)"), deck_rows, self.batch_size)
+            cursor.close()
+
+        self.stats["ingested"] += len(new)
+        return len(new)
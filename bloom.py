@@ -0,0 +1,72 @@
+import hashlib
+import math
+import os
+
+"""
+Compact bloom filter for deduplicating tags (and battle fingerprints) at scale.
+
+Ten million tags at a 1% false-positive rate fit in about 12 MB, versus
+several hundred MB for a Python set of strings. False positives mean an
+item is occasionally treated as already seen; there are no false negatives.
+"""
+
+
+class BloomFilter:
+    """
+    Args:
+        capacity (int): Number of items the filter is sized for.
+        error_rate (float): Target false-positive rate at capacity.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(item.encode() if isinstance(item, str) else item, digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little")
+        b = int.from_bytes(digest[8:], "little") | 1
+        return [(a + i * b) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add an item. Returns True if it was (probably) not in the filter before."""
+        new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        self.count += new
+        return new
+
+    def __contains__(self, item):
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def save(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as file:
+            header = f"{self.capacity} {self.error_rate} {self.count}\n".encode()
+            file.write(header)
+            file.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            capacity, error_rate, count = file.readline().split()
+            bloom = cls(int(capacity), float(error_rate))
+            bloom.bits = bytearray(file.read())
+            bloom.count = int(count)
+        return bloom
@@ -0,0 +1,174 @@
+import glob
+import os
+
+import cv2 as cv
+import numpy as np
+
+"""
+Screen capture of several regions from a single grab.
+
+A Capture grabs the screen once per call, crops every named region as a
+view of that one frame and converts only those regions to grayscale, rather
+than taking a full screenshot and converting the whole frame for each
+region:
+
+    capture = Capture({"player": player_dim, "opponent": opponent_dim})
+    regions = capture.grab()        # {"player": array, "opponent": array}
+
+Regions use img_processing.py's format: (x1, x2, y1, y2), or (x1, x2) for
+full-height columns.
+
+Backends (CR_CAPTURE picks the default):
+
+    pyautogui   pg.screenshot(), works everywhere pyautogui does (default)
+    mss         mss grabs (X11 shared memory / native APIs), much faster (pip install mss)
+    replay      frames from a folder of images or a video file, for headless testing
+
+The replay source is CR_CAPTURE_SOURCE unless one is passed in:
+
+    CR_CAPTURE=replay CR_CAPTURE_SOURCE=data/sequence_3 python advisor.py
+
+A replay runs out: grab() returns None after the last frame, which callers
+have to handle.
+"""
+
+
+def crop(frame, dim):
+    """View of a region of the frame (no copy)."""
+    if len(dim) == 4:
+        x1, x2, y1, y2 = dim
+        return frame[y1:y2, x1:x2]
+    x1, x2 = dim
+    return frame[:, x1:x2]
+
+
+class PyAutoGUIBackend:
+    color = cv.COLOR_RGB2GRAY
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def grab(self):
+        return np.asarray(self.pyautogui.screenshot())
+
+    def close(self):
+        pass
+
+
+class MSSBackend:
+    """
+    Args:
+        monitor (int): mss monitor number (1 is the primary screen, 0 all of them).
+    """
+    color = cv.COLOR_BGRA2GRAY
+
+    def __init__(self, monitor=1):
+        try:
+            import mss
+        except ImportError:
+            raise ImportError("The mss capture backend requires the mss package (pip install mss)")
+        self.sct = mss.mss()
+        self.monitor = self.sct.monitors[monitor]
+
+    def grab(self):
+        # wraps mss' BGRA buffer without copying it
+        return np.asarray(self.sct.grab(self.monitor))
+
+    def close(self):
+        self.sct.close()
+
+
+class ReplayBackend:
+    """
+    Args:
+        source (str): Folder of images (played in name order) or a video file.
+        loop (bool): Start over at the end instead of returning None.
+    """
+    color = cv.COLOR_BGR2GRAY
+
+    def __init__(self, source, loop=False):
+        self.source = source
+        self.loop = loop
+        self.video = None
+        self.files = []
+        self.position = 0
+        if os.path.isdir(source):
+            self.files = sorted(
+                path for path in glob.glob(os.path.join(source, "*"))
+                if os.path.splitext(path)[1].lower() in (".png", ".jpg", ".jpeg", ".bmp")
+            )
+        else:
+            self.video = cv.VideoCapture(source)
+            if not self.video.isOpened():
+                raise ValueError(f"Can't open {source} for replay")
+
+    def grab(self):
+        """Next frame (BGR), or None when the source is exhausted."""
+        if self.video is not None:
+            ok, frame = self.video.read()
+            if not ok and self.loop:
+                self.video.set(cv.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = self.video.read()
+            return frame if ok else None
+        if self.position >= len(self.files):
+            if not self.loop or not self.files:
+                return None
+            self.position = 0
+        frame = cv.imread(self.files[self.position], cv.IMREAD_COLOR)
+        self.position += 1
+        return frame
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "mss": MSSBackend,
+    "replay": ReplayBackend,
+}
+
+
+def get_backend(name=None, **options):
+    """
+    Capture backend by name, CR_CAPTURE by default ('pyautogui' if unset).
+    The replay backend reads its source from CR_CAPTURE_SOURCE when none is given.
+    """
+    name = name or os.environ.get("CR_CAPTURE", "pyautogui")
+    if name == "replay" and "source" not in options:
+        source = os.environ.get("CR_CAPTURE_SOURCE")
+        if not source:
+            raise ValueError("The replay capture backend needs a source: set CR_CAPTURE_SOURCE to a folder or video")
+        options["source"] = source
+    return BACKENDS[name](**options)
+
+
+class Capture:
+    """
+    Args:
+        regions (dict): Region name -> dim.
+        backend (optional): Backend instance, get_backend() by default.
+        gray (bool): Convert regions to grayscale. Without it the regions are
+            returned as views of the grabbed frame, in the backend's color order.
+    """
+
+    def __init__(self, regions, backend=None, gray=True):
+        self.regions = dict(regions)
+        self.backend = backend or get_backend()
+        self.gray = gray
+
+    def grab(self):
+        """{region name: image} from one screen grab, or None when a replay has run out."""
+        frame = self.backend.grab()
+        if frame is None:
+            return None
+        regions = {}
+        for name, dim in self.regions.items():
+            region = crop(frame, dim)
+            regions[name] = cv.cvtColor(region, self.backend.color) if self.gray else region
+        return regions
+
+    def close(self):
+        self.backend.close()
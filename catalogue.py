@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+
+from API.cards import cards
+
+"""
+Process-wide card catalogue.
+
+Loads the card list once (from the API when a token is given, otherwise
+from data/cards/names.txt) and keeps O(1) lookups by card id, API name
+("Mega Knight") and the slug form used in data/trippledraft/card_data.csv
+("mega-knight"). Every card also gets a small dense index (0..n-1, ordered
+by id) for packing decks into arrays.
+
+    catalogue = get_catalogue(token)
+    catalogue.get("mega-knight")["elixirCost"]
+    catalogue.get(26000055)["name"]
+"""
+
+names_path = "data/cards/names.txt"
+evolutions_path = "data/cards/evolutions.txt"
+
+
+def slug(name):
+    """
+    'Mega Knight' -> 'mega-knight', 'Mini P.E.K.K.A' -> 'mini-pekka', 'X-Bow' -> 'x-bow'
+    """
+    return "-".join(name.lower().replace(".", "").split())
+
+
+def _read_lines(path):
+    with open(path, 'r') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+class CardCatalogue:
+    """
+    Args:
+        items (list): Card dicts as returned in cards()["items"] (and "supportItems").
+    """
+
+    def __init__(self, items=()):
+        self.cards = []
+        self.by_id = {}
+        self.by_name = {}
+        self.by_slug = {}
+        self.indices = {}
+
+        items = sorted(items, key=lambda card: (card.get("id") is None, card.get("id") or 0, card["name"]))
+        for card in items:
+            key = slug(card["name"])
+            if key in self.by_slug:
+                continue  # names.txt lists a few cards twice
+            card = dict(card, slug=key)
+            self.indices[key] = len(self.cards)
+            self.cards.append(card)
+            self.by_slug[key] = card
+            self.by_name[card["name"].lower()] = card
+            if card.get("id") is not None:
+                self.by_id[card["id"]] = card
+
+    @classmethod
+    def from_api(cls, token):
+        """Build the catalogue from cards(), or None if the request failed."""
+        response = cards(token)
+        if not response:
+            return None
+        return cls(response.get("items", []) + response.get("supportItems", []))
+
+    @classmethod
+    def from_files(cls, names=names_path, evolutions=evolutions_path):
+        """Offline catalogue from names.txt, without ids or elixir costs."""
+        evolved = {slug(name) for name in _read_lines(evolutions)}
+        items = []
+        for name in _read_lines(names):
+            items.append({
+                "id": None,
+                "name": name,
+                "maxEvolutionLevel": 1 if slug(name) in evolved else 0
+            })
+        return cls(items)
+
+    def get(self, key, default=None):
+        """Look a card up by id (int), API name or slug."""
+        if isinstance(key, int):
+            return self.by_id.get(key, default)
+        card = self.by_slug.get(key)
+        if card is None:
+            card = self.by_name.get(key.lower())
+        if card is None:
+            card = self.by_slug.get(slug(key), default)
+        return card
+
+    def __getitem__(self, key):
+        card = self.get(key)
+        if card is None:
+            raise KeyError(key)
+        return card
+
+    def index(self, key):
+        """Dense 0..n-1 index of a card, for packing decks into arrays."""
+        return self.indices[self[key]["slug"]]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+
+_catalogue = None
+_checked = 0.0
+_lock = threading.Lock()
+
+
+def get_catalogue(token=None, refresh_interval=60 * 60):
+    """
+    Return the shared catalogue, loading it on first use.
+
+    With a token the card list is re-checked at most every refresh_interval
+    seconds and the lookup tables are only rebuilt when the number of cards
+    upstream has changed (i.e. a new card was released).
+    """
+    global _catalogue, _checked
+    with _lock:
+        now = time.monotonic()
+        if _catalogue is not None and (token is None or now - _checked < refresh_interval):
+            return _catalogue
+        if token is not None:
+            _checked = now
+            response = cards(token)
+            if response:
+                items = response.get("items", []) + response.get("supportItems", [])
+                if _catalogue is None or len(items) != len(_catalogue) or not _catalogue.by_id:
+                    _catalogue = CardCatalogue(items)
+        if _catalogue is None:
+            _catalogue = CardCatalogue.from_files()
+        return _catalogue
+
+
+codes_path = "data/cards/codes.json"
+
+
+class CardCodec:
+    """
+    Stable mapping between API card ids (26000000, 28000011, ...) and small
+    integer codes (0, 1, 2, ...) for compact storage.
+
+    Codes are handed out in order of first appearance and persisted, so data
+    written with an older mapping still decodes after new cards are released.
+    Unlike CardCatalogue.index, a code never changes once assigned.
+    """
+
+    def __init__(self, path=codes_path):
+        self.path = path
+        self.ids = []
+        if path and os.path.exists(path):
+            with open(path, 'r') as file:
+                self.ids = json.load(file)
+        self.codes = {card_id: code for code, card_id in enumerate(self.ids)}
+        self.lock = threading.Lock()
+
+    def encode(self, card_id):
+        code = self.codes.get(card_id)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(card_id)
+                if code is None:
+                    code = self.codes[card_id] = len(self.ids)
+                    self.ids.append(card_id)
+        return code
+
+    def decode(self, code):
+        return self.ids[code]
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as file:
+            json.dump(self.ids, file)
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self.ids)
@@ -0,0 +1,164 @@
+import json
+import os
+import time
+
+from API.players import battle_logs
+
+"""
+Checkpointed, resumable crawl jobs.
+
+A Checkpoint is an append-only JSON-lines log of what a job has done:
+
+    {"done": "#UY0VLUC"}
+    {"failed": "#URJ2G80PV", "error": "no response"}
+    {"cursor": "leaderboard:170000005", "value": "eyJwb3MiOjEwMH0"}
+
+Replaying the log on start-up rebuilds the set of finished items, the items
+that failed (and haven't succeeded since) and the last saved cursors, so a
+job interrupted by a crash or Ctrl-C skips everything it already finished
+and only retries what failed.
+
+    python checkpoint.py   # sweep data/tags/tags.txt battle logs, resumable
+"""
+
+jobs_dir = "data/jobs"
+tags_path = "data/tags/tags.txt"
+
+
+class Checkpoint:
+    """
+    Args:
+        path (str): Log file, created if missing.
+        fsync_every (int): fsync the log after this many records (every record
+            is flushed to the OS immediately either way).
+    """
+
+    def __init__(self, path, fsync_every=50):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.fsync_every = fsync_every
+        self.done = set()
+        self.failed = {}
+        self.cursors = {}
+        self._unsynced = 0
+        if os.path.exists(path):
+            self._replay()
+        self.file = open(path, 'a')
+
+    def _replay(self):
+        with open(self.path, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                if "done" in record:
+                    self.done.add(record["done"])
+                    self.failed.pop(record["done"], None)
+                elif "failed" in record:
+                    self.failed[record["failed"]] = record.get("error")
+                elif "cursor" in record:
+                    self.cursors[record["cursor"]] = record.get("value")
+
+    def _write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def mark_done(self, key):
+        self.done.add(key)
+        self.failed.pop(key, None)
+        self._write({"done": key})
+
+    def mark_failed(self, key, error=None):
+        self.failed[key] = error
+        self._write({"failed": key, "error": error})
+
+    def set_cursor(self, name, value):
+        """Remember a paging cursor (or any resume position) under a name."""
+        self.cursors[name] = value
+        self._write({"cursor": name, "value": value})
+
+    def pending(self, items):
+        """Items that haven't been finished yet (never tried, or failed)."""
+        return (item for item in items if item not in self.done)
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    def run(self, items, fn, progress_every=100):
+        """
+        Call fn(item) for every unfinished item, logging each success or failure.
+
+        fn should persist its own results and return something falsy (or raise)
+        on failure. Exceptions other than KeyboardInterrupt are logged as
+        failures and the job moves on. Returns (done, failed) counts for this run.
+        """
+        done = failed = 0
+        started = time.time()
+        try:
+            for item in self.pending(items):
+                try:
+                    ok = fn(item)
+                    error = None if ok else "no result"
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    ok, error = False, repr(e)
+                if ok:
+                    self.mark_done(item)
+                    done += 1
+                else:
+                    self.mark_failed(item, error)
+                    failed += 1
+                if (done + failed) % progress_every == 0:
+                    rate = (done + failed) / max(time.time() - started, 1e-9)
+                    print(f"{done} done, {failed} failed ({rate:.1f}/s), {len(self.done)} finished in total")
+        except KeyboardInterrupt:
+            print("Stopping job, progress is saved")
+        finally:
+            self.sync()
+        return done, failed
+
+    def retry_failed(self, fn):
+        """Run fn again over only the items that failed."""
+        return self.run(list(self.failed), fn)
+
+
+def load_tags(path=tags_path):
+    with open(path, 'r') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def sweep_battle_logs(token, tags=None, output=os.path.join(jobs_dir, "battle_logs.jsonl"), checkpoint=os.path.join(jobs_dir, "battle_logs.checkpoint")):
+    """
+    Fetch the battle log of every tag in data/tags/tags.txt into a JSON-lines
+    file ({"tag": ..., "battles": [...]} per line), resuming after interruptions.
+    """
+    tags = load_tags() if tags is None else tags
+    log = Checkpoint(checkpoint)
+    with open(output, 'a') as out:
+        def fetch(tag):
+            battles = battle_logs(token, tag)
+            if battles is None:
+                return False
+            out.write(json.dumps({"tag": tag, "battles": battles}) + "\n")
+            out.flush()
+            return True
+        result = log.run(tags, fetch)
+    log.close()
+    return result
+
+
+if __name__ == '__main__':
+    from API.keys import KeyPool
+    print(sweep_battle_logs(KeyPool.load()))
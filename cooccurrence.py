@@ -0,0 +1,181 @@
+import os
+
+import numpy as np
+
+from deck import EMPTY, SLOTS, Deck, one_hot
+
+"""
+Card co-occurrence counts.
+
+"identify what cards are more likely to be in the same sequence together"
+(tracker.py): for every pair of cards, how many decks hold both, and how
+many of those decks won. Decks come in as (n, 8) arrays of CardCodec codes
+and each chunk of them is one matrix product, X.T @ X over the one-hot deck
+matrix, so millions of decks are counted without a Python loop per deck.
+
+Counts are additive, so new battles are folded in with update() as they
+arrive and the matrices are saved/loaded as .npz:
+
+    matrix = Cooccurrence(game_modes=["Draft_Competitive"], trophies=(6000, 9000))
+    matrix.update_from_parquet()                 # everything exported so far
+    matrix.update_from_battles(battles, codec)   # then new battle logs
+    matrix.conditional(codec.encode(26000055))   # P(card | Mega Knight)
+"""
+
+cooccurrence_path = "data/cooccurrence.npz"
+
+
+def codes_array(lists):
+    """List of card code lists -> (n, 8) uint8 array, short decks padded with EMPTY."""
+    codes = np.full((len(lists), SLOTS), EMPTY, dtype=np.uint8)
+    for i, cards in enumerate(lists):
+        codes[i, :len(cards)] = cards
+    return codes
+
+
+def load_decks(path=None, dates=None, game_modes=None, trophies=None):
+    """
+    Decks from the Parquet export (see export.py) as ((n, 8) card codes, (n,) won),
+    optionally filtered by date range, game modes and starting trophies.
+    """
+    from export import load, parquet_path
+
+    path = path or parquet_path
+    participants = load("participants", path, ["battle_id", "player_tag", "team", "crowns", "trophies"], dates, game_modes)
+    if participants.empty:
+        return np.zeros((0, SLOTS), dtype=np.uint8), np.zeros(0, dtype=bool)
+    decks = load("decks", path, ["battle_id", "player_tag", "cards"], dates, game_modes)
+
+    crowns = participants.groupby(["battle_id", "team"])["crowns"].max().unstack("team")
+    participants = participants.join(crowns, on="battle_id")
+    own = np.where(participants["team"] == 0, participants[0], participants[1])
+    other = np.where(participants["team"] == 0, participants[1], participants[0])
+    participants["won"] = own > other
+    if trophies is not None:
+        low, high = trophies
+        participants = participants[participants["trophies"].between(low, high)]
+
+    rows = decks.merge(participants[["battle_id", "player_tag", "won"]], on=["battle_id", "player_tag"])
+    return codes_array(rows["cards"].tolist()), rows["won"].to_numpy(dtype=bool)
+
+
+class Cooccurrence:
+    """
+    Args:
+        n_cards (int): Size of the card axis (codes 0..n_cards-1).
+        game_modes (list, optional): Only count decks from these game modes.
+        trophies (tuple, optional): Only count decks whose player started the
+            battle within this inclusive (low, high) trophy range.
+        chunk_size (int): Decks per matrix product.
+    """
+
+    def __init__(self, n_cards=EMPTY, game_modes=None, trophies=None, chunk_size=100_000):
+        self.n_cards = n_cards
+        self.game_modes = set(game_modes) if game_modes is not None else None
+        self.trophies = trophies
+        self.chunk_size = chunk_size
+        self.counts = np.zeros((n_cards, n_cards), dtype=np.int64)
+        self.wins = np.zeros((n_cards, n_cards), dtype=np.int64)
+        self.decks = 0
+        self.won = 0
+
+    def _accumulate(self, target, codes):
+        for i in range(0, len(codes), self.chunk_size):
+            # float32 BLAS is exact here: no entry of one chunk can exceed chunk_size < 2**24
+            x = one_hot(codes[i:i + self.chunk_size], self.n_cards).astype(np.float32)
+            target += (x.T @ x).astype(np.int64)
+
+    def update(self, codes, won):
+        """
+        Add decks to the counts.
+
+        Args:
+            codes (array): (n, 8) card codes, EMPTY for missing slots.
+            won (array): (n,) booleans, whether each deck won its battle.
+        """
+        codes = np.asarray(codes, dtype=np.uint8)
+        won = np.asarray(won, dtype=bool)
+        if not len(codes):
+            return
+        self._accumulate(self.counts, codes)
+        self._accumulate(self.wins, codes[won])
+        self.decks += len(codes)
+        self.won += int(won.sum())
+
+    def accepts(self, game_mode, trophies):
+        if self.game_modes is not None and game_mode not in self.game_modes:
+            return False
+        if self.trophies is not None:
+            low, high = self.trophies
+            return trophies is not None and low <= trophies <= high
+        return True
+
+    def update_from_battles(self, battles, codec):
+        """Add both sides' decks from battle-log entries."""
+        decks = []
+        won = []
+        for battle in battles:
+            if not battle.get("team") or not battle.get("opponent"):
+                continue
+            mode = battle.get("gameMode", {}).get("name")
+            crowns = {side: max(p.get("crowns") or 0 for p in battle[side]) for side in ("team", "opponent")}
+            for side, other in (("team", "opponent"), ("opponent", "team")):
+                for player in battle[side]:
+                    if self.accepts(mode, player.get("startingTrophies")):
+                        decks.append(Deck.from_cards(player.get("cards", []), codec).codes)
+                        won.append(crowns[side] > crowns[other])
+        self.update(codes_array(decks), won)
+
+    def update_from_parquet(self, path=None, dates=None):
+        """Add the decks in the Parquet export (see export.py), optionally only a date range."""
+        game_modes = sorted(self.game_modes) if self.game_modes is not None else None
+        self.update(*load_decks(path, dates, game_modes, self.trophies))
+
+    def card_counts(self):
+        """Decks containing each card."""
+        return np.diag(self.counts).copy()
+
+    def conditional(self, code):
+        """P(other card in deck | code in deck), one value per card."""
+        total = self.counts[code, code]
+        return self.counts[code] / total if total else np.zeros(self.n_cards)
+
+    def win_rates(self):
+        """Win rate of decks holding both cards of each pair (NaN where never seen)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.counts > 0, self.wins / self.counts, np.nan)
+
+    def top_pairs(self, code, k=10, min_count=1):
+        """The k cards most often played with code, as [(code, count, win rate)]."""
+        counts = self.counts[code].copy()
+        counts[code] = 0
+        counts[counts < min_count] = 0
+        best = np.argsort(counts)[::-1][:k]
+        return [
+            (int(other), int(counts[other]), float(self.wins[code, other] / counts[other]))
+            for other in best if counts[other]
+        ]
+
+    def save(self, path=cooccurrence_path):
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp, counts=self.counts, wins=self.wins, totals=np.array([self.decks, self.won]),
+            game_modes=np.array(sorted(self.game_modes) if self.game_modes is not None else [], dtype=str),
+            trophies=np.array(self.trophies if self.trophies is not None else [], dtype=np.int64),
+            filtered=np.array([self.game_modes is not None, self.trophies is not None]),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=cooccurrence_path):
+        with np.load(path) as saved:
+            filtered = saved["filtered"]
+            matrix = cls(
+                len(saved["counts"]),
+                saved["game_modes"].tolist() if filtered[0] else None,
+                tuple(saved["trophies"].tolist()) if filtered[1] else None,
+            )
+            matrix.counts = saved["counts"]
+            matrix.wins = saved["wins"]
+            matrix.decks, matrix.won = (int(n) for n in saved["totals"])
+        return matrix
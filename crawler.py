@@ -0,0 +1,251 @@
+import json
+import os
+
+from API.leaderboards import leaderboards
+from API.paging import PageError, iter_leaderboard, iter_members
+from API.players import battle_logs
+from bloom import BloomFilter
+from checkpoint import Checkpoint
+
+"""
+Breadth-first tag discovery crawler.
+
+Automates the plan in api.py: start from the leaderboards, expand to the
+clans on them, to those clans' members, and to the opponents (and their
+clans) found in each player's battle log. Players with Draft_Competitive
+games are appended to the output file.
+
+Everything that has to survive millions of tags lives on disk: the frontier
+is an append-only file read through a saved offset, and the seen-set is a
+bloom filter. Only one API payload is held in memory at a time. Stopping
+and restarting the crawler picks up from the last checkpoint, and a
+leaderboard or clan that was interrupted (or whose page request failed)
+resumes from the paging cursor saved in the checkpoint log.
+
+    crawler = Crawler(token)
+    crawler.seed()      # only needed on the first run
+    crawler.run()
+"""
+
+state_dir = "data/crawl"
+DRAFT_MODE = "Draft_Competitive"
+
+PLAYER = "player"
+CLAN = "clan"
+LEADERBOARD = "leaderboard"
+
+
+class FileQueue:
+    """
+    FIFO queue of (kind, key) pairs stored as lines in a file.
+
+    put() appends, get() reads from a saved offset, so the queue can grow to
+    millions of entries without living in memory. commit() persists the read
+    offset; anything read after the last commit is read again after a restart.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset_path = f"{path}.offset"
+        self.writer = open(path, 'a')
+        self.reader = open(path, 'r')
+        self.offset = 0
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path, 'r') as file:
+                self.offset = int(file.read() or 0)
+        self.reader.seek(self.offset)
+
+    def put(self, kind, key):
+        self.writer.write(f"{kind}\t{key}\n")
+
+    def get(self):
+        """Next (kind, key), or None when the queue is drained."""
+        self.writer.flush()
+        line = self.reader.readline()
+        if not line.endswith("\n"):
+            self.reader.seek(self.offset)  # partial or no line, try again later
+            return None
+        self.offset = self.reader.tell()
+        kind, key = line.rstrip("\n").split("\t", 1)
+        return kind, key
+
+    def commit(self):
+        self.writer.flush()
+        os.fsync(self.writer.fileno())
+        tmp = f"{self.offset_path}.tmp"
+        with open(tmp, 'w') as file:
+            file.write(str(self.offset))
+        os.replace(tmp, self.offset_path)
+
+    def close(self):
+        self.writer.close()
+        self.reader.close()
+
+
+class Crawler:
+    """
+    Args:
+        token (str or KeyPool): API token.
+        path (str): Directory for the frontier, seen-filter and results.
+        capacity (int): Expected number of distinct tags, sizes the bloom filter.
+        checkpoint_every (int): Persist progress after this many processed entries.
+        leaderboard_limit (int, optional): Players to take from each leaderboard.
+    """
+
+    def __init__(self, token, path=state_dir, capacity=10_000_000, checkpoint_every=100, leaderboard_limit=1000):
+        os.makedirs(path, exist_ok=True)
+        self.token = token
+        self.checkpoint_every = checkpoint_every
+        self.leaderboard_limit = leaderboard_limit
+
+        self.bloom_path = os.path.join(path, "seen.bloom")
+        self.stats_path = os.path.join(path, "stats.json")
+        if os.path.exists(self.bloom_path):
+            self.seen = BloomFilter.load(self.bloom_path)
+        else:
+            self.seen = BloomFilter(capacity)
+        self.stats = {PLAYER: 0, CLAN: 0, LEADERBOARD: 0, "draft_players": 0, "failed": 0}
+        if os.path.exists(self.stats_path):
+            with open(self.stats_path, 'r') as file:
+                self.stats.update(json.load(file))
+
+        self.frontier = FileQueue(os.path.join(path, "frontier.tsv"))
+        self.failures = Checkpoint(os.path.join(path, "failures.log"))  # also holds the paging cursors
+        self.output = open(os.path.join(path, "draft_players.txt"), 'a')
+
+    def enqueue(self, kind, key):
+        if not key:
+            return
+        if self.seen.add(f"{kind}:{key}"):
+            self.frontier.put(kind, key)
+
+    def seed(self, leaderboard_ids=None):
+        """Queue the leaderboards (all of them by default) as the crawl's starting points."""
+        if leaderboard_ids is None:
+            response = leaderboards(self.token) or {}
+            items = response.get("items", []) if isinstance(response, dict) else response
+            leaderboard_ids = [item["id"] for item in items]
+        for leaderboard_id in leaderboard_ids:
+            self.enqueue(LEADERBOARD, str(leaderboard_id))
+
+    def _paged(self, name, iterate, limit=None):
+        """
+        Items from iterate(limit, after, on_page), resuming from the cursor saved
+        under name. The cursor is saved after every page and cleared at the end.
+        """
+        resume = self.failures.cursors.get(name) or {}
+        consumed = resume.get("items", 0)
+        if limit is not None:
+            limit -= consumed
+
+        def save(after, items):
+            self.failures.set_cursor(name, {"after": after, "items": consumed + items})
+
+        yield from iterate(limit, resume.get("after"), save)
+        if resume or name in self.failures.cursors:
+            self.failures.set_cursor(name, None)
+
+    def visit_leaderboard(self, leaderboard_id):
+        entries = self._paged(
+            f"{LEADERBOARD}:{leaderboard_id}",
+            lambda limit, after, on_page: iter_leaderboard(self.token, leaderboard_id, limit, after, on_page),
+            self.leaderboard_limit,
+        )
+        try:
+            for entry in entries:
+                self.enqueue(PLAYER, entry.get("tag"))
+                self.enqueue(CLAN, (entry.get("clan") or {}).get("tag"))
+        except PageError as e:
+            print(f"Error reading leaderboard {leaderboard_id}: {e}")
+            return False
+        return True
+
+    def visit_clan(self, clan_tag):
+        members = self._paged(
+            f"{CLAN}:{clan_tag}",
+            lambda limit, after, on_page: iter_members(self.token, clan_tag, limit, after, on_page),
+        )
+        try:
+            for member in members:
+                self.enqueue(PLAYER, member.get("tag"))
+        except PageError as e:
+            print(f"Error reading the members of {clan_tag}: {e}")
+            return False
+        return True
+
+    def visit_player(self, tag):
+        logs = battle_logs(self.token, tag)
+        if logs is None:
+            return False
+        plays_draft = False
+        for log in logs:
+            if log.get("gameMode", {}).get("name") == DRAFT_MODE:
+                plays_draft = True
+            for opponent in log.get("opponent", []) + log.get("team", []):
+                self.enqueue(PLAYER, opponent.get("tag"))
+                self.enqueue(CLAN, (opponent.get("clan") or {}).get("tag"))
+        if plays_draft:
+            self.output.write(f"{tag}\n")
+            self.stats["draft_players"] += 1
+        return True
+
+    def visit(self, kind, key):
+        if kind == PLAYER:
+            return self.visit_player(key)
+        if kind == CLAN:
+            return self.visit_clan(key)
+        if kind == LEADERBOARD:
+            return self.visit_leaderboard(key)
+        raise ValueError(f"Unknown frontier entry kind: {kind}")
+
+    def retry_failed(self):
+        """Put every entry that failed back on the frontier. Returns how many were requeued."""
+        failed = list(self.failures.failed)
+        for entry in failed:
+            kind, key = entry.split("\t", 1)
+            self.frontier.put(kind, key)
+            self.failures.mark_done(entry)
+        self.checkpoint()
+        return len(failed)
+
+    def checkpoint(self):
+        self.failures.sync()
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        self.seen.save(self.bloom_path)
+        self.frontier.commit()
+        tmp = f"{self.stats_path}.tmp"
+        with open(tmp, 'w') as file:
+            json.dump(self.stats, file)
+        os.replace(tmp, self.stats_path)
+
+    def run(self, max_items=None):
+        """
+        Process the frontier until it is empty, max_items entries have been
+        visited, or Ctrl-C. Progress is checkpointed on the way out.
+        """
+        processed = 0
+        try:
+            while max_items is None or processed < max_items:
+                entry = self.frontier.get()
+                if entry is None:
+                    break
+                kind, key = entry
+                if not self.visit(kind, key):
+                    self.failures.mark_failed(f"{kind}\t{key}")
+                    self.stats["failed"] += 1
+                self.stats[kind] += 1
+                processed += 1
+                if processed % self.checkpoint_every == 0:
+                    self.checkpoint()
+                    print(f"Crawled {processed} entries, {self.stats['draft_players']} draft players, {len(self.seen)} tags seen")
+        except KeyboardInterrupt:
+            print("Stopping crawl")
+        finally:
+            self.checkpoint()
+        return processed
+
+    def close(self):
+        self.failures.close()
+        self.frontier.close()
+        self.output.close()
@@ -1,160 +1,156 @@
-import mysql.connector
 import os
 import pandas as pd
 
-user = "root"
-password = ""
-dbName = "clashroyale"
+from catalogue import slug
+from storage import get_backend
 
 def connect_db():
-    try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            port=3306,  # Default MySQL port
-            database=dbName,  # Replace with your database name
-            user=user,     
-            password=password)
-        
-        if conn is None:
-            print("Database connection unsuccessful")
-        return conn
-    except mysql.connector.Error as err:
-        print(f"Error connecting to MySQL: {err}")
-        return None
+    """Raw connection from the configured backend (see storage.py); prefer connection()."""
+    return get_backend().connect()
 
+def connection():
+    """
+    with connection() as conn:
+        ...
 
-cards_path = "data/cards/names.txt"
-# load all the cards into the database
-def load_cards(path):
-    cards = []
+    Commits when the block finishes, rolls back if it raises, and returns
+    pooled connections to the pool.
+    """
+    return get_backend().connection()
+
+
+BATCH_SIZE = 1000
+
+
+def read_card_names(path):
+    """Read a file of card names (one per line) as slugs, e.g. 'Mega Knight' -> 'mega-knight'."""
     with open(path, 'r') as file:
-        lines = file.readlines()
-        for line in lines:
-            line = line.strip()
-            if len(line.split(" ")) == 2:
-                x, y = line.split(" ")
-                name = f"{x.lower()}-{y.lower()}"
-            else:
-                name = line.lower()
-            cards.append(name)
-
-    conn = connect_db()
-    cursor = conn.cursor()
+        return [slug(line) for line in file if line.strip()]
+
+
+def insert_many(cursor, sql, rows, batch_size=BATCH_SIZE):
+    """
+    Run an INSERT for every row in batches of batch_size.
+
+    mysql.connector rewrites an executemany INSERT into multi-row VALUES
+    statements, so each batch is a single round trip.
+    """
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def bulk_insert(table, columns, rows, batch_size=BATCH_SIZE, ignore=True):
+    """
+    Insert an iterable of row tuples into table in one transaction.
+
+    Rows are consumed lazily, so generators over hundreds of thousands of
+    battle rows never have to be materialised.
+    """
+    placeholders = ", ".join(["%s"] * len(columns))
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    sql = get_backend().sql(f"INSERT {'IGNORE ' if ignore else ''}INTO {table} ({column_list}) VALUES ({placeholders})")
 
     try:
-        for card in cards:
-            cursor.execute(
-                "INSERT IGNORE INTO card (card_name) VALUES (%s)",
-                [card]
-            )
-        conn.commit()
+        with connection() as conn:
+            cursor = conn.cursor()
+            count = insert_many(cursor, sql, rows, batch_size)
+            cursor.close()
+        return count
     except Exception as e:
-        print(f"Error loading cards: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+        print(f"Error inserting into {table}: {e}")
+        return 0
+
+
+cards_path = "data/cards/names.txt"
+# load all the cards into the database
+def load_cards(path, batch_size=BATCH_SIZE):
+    cards = read_card_names(path)
+    return bulk_insert("card", ["card_name"], ((card,) for card in cards), batch_size)
             
 card_types = "data/trippledraft/types"
 # TODO
 
 # load tripple draft card types into the database
-def load_card_types(path):
-    dirs = os.listdir(path)
-    for dir in dirs:
-        cards = []
-        table = dir.split(".")[0]
-        with open(os.path.join(path, dir), 'r') as file:
-            lines = file.readlines()
-            for line in lines:
-                line = line.strip()
-                if len(line.split(" ")) == 2:
-                    x, y = line.split(" ")
-                    name = f"{x.lower()}-{y.lower()}"
-                else:
-                    name = line.lower()
-                cards.append(name)
-        conn = connect_db()
-        cursor = conn.cursor()
-        try:
-            for card in cards:
-                cursor.execute(
-                    f"INSERT IGNORE INTO {table} (card_name) VALUES (%s)",
-                    [card]
+def load_card_types(path, batch_size=BATCH_SIZE):
+    try:
+        # one connection and one transaction for every type file
+        with connection() as conn:
+            cursor = conn.cursor()
+            for dir in os.listdir(path):
+                table = dir.split(".")[0]
+                cards = read_card_names(os.path.join(path, dir))
+                insert_many(
+                    cursor,
+                    get_backend().sql(f"INSERT IGNORE INTO {table} (card_name) VALUES (%s)"),
+                    ((card,) for card in cards),
+                    batch_size
                 )
-            conn.commit()
-        except Exception as e:
-            print(f"Error loading cards: {e}")
-        finally:
             cursor.close()
-            conn.close()
+    except Exception as e:
+        print(f"Error loading cards: {e}")
                 
 
 card_stats = "data/trippledraft/card_data.csv"
 # load tripple draft card statiss into the database 
-def load_card_stats(path):
-    conn = connect_db()
-    cursor = conn.cursor()
+def load_card_stats(path, batch_size=BATCH_SIZE):
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
 
+            # resolve every card_id up front instead of a SELECT per row
+            cursor.execute("SELECT card_name, card_id FROM card")
+            card_ids = dict(cursor.fetchall())
 
-    # create the table if it doesn't exist
-    ## loop through csv rows and add them to the database
-    try:
-        df = pd.read_csv(path)
-        for i in df.iterrows():
-            row = i[1]
-            name = row["card"].lower()
-            ranking = row["ranking"]
-            rating = row["rating"]
-            usage = row["usage"]    
-            usage_delta = row["usage_delta"]
-            win = row["win"]
-            win_delta = row["win_delta"]
-            cwr = row["cwr"]
-
-            # 1. Get the card_id
-            cursor.execute("SELECT card_id FROM card WHERE card_name = %s", [name])
-            card_id_result = cursor.fetchone()
-
-            if card_id_result:
-                card_id = card_id_result[0]  # Extract the card_id from the result
-
-                # 2. Insert into tripple_draft_stats using the retrieved card_id
-                sql_insert = """
-                    INSERT IGNORE INTO tripple_draft_stats (card_id, ranking, rating, `usage`, usage_delta, win, win_delta, cwr)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                values_insert = (card_id, ranking, rating, usage, usage_delta, win, win_delta, cwr)
-                cursor.execute(sql_insert, values_insert)
-            else:
+            df = pd.read_csv(path, skipinitialspace=True)
+            df["card"] = df["card"].str.lower()
+            missing = df.loc[~df["card"].isin(card_ids), "card"]
+            for name in missing:
                 print(f"Warning: Card '{name}' not found in the 'card' table. Skipping stats insertion.")
-        conn.commit()
+            df = df[df["card"].isin(card_ids)]
+
+            columns = ["ranking", "rating", "usage", "usage_delta", "win", "win_delta", "cwr"]
+            rows = (
+                (card_ids[row[0]], *row[1:])
+                for row in df[["card"] + columns].itertuples(index=False, name=None)
+            )
+            sql_insert = """
+                INSERT IGNORE INTO tripple_draft_stats (card_id, ranking, rating, `usage`, usage_delta, win, win_delta, cwr)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            insert_many(cursor, get_backend().sql(sql_insert), rows, batch_size)
+            cursor.close()
     except Exception as e:
         print(f"Error loading card stats: {e}")
-    finally:
-        cursor.close()
-        conn.close()
     
 
 
-load_cards(cards_path)
-# load_card_types(card_types)
-load_card_stats(card_stats)
+if __name__ == '__main__':
+    get_backend().create_schema()
+    load_cards(cards_path)
+    # load_card_types(card_types)
+    load_card_stats(card_stats)
 
 sequences = "data/trippleraft/sequences.txt"
 def load_sequences(path):
-    conn = connect_db()
-    cursor = conn.cursor()
-
     # create the table if it doesn't exist
     try:
-        with open(path, 'r') as file:
-            lines = file.readlines()
-            
+        with connection() as conn:
+            cursor = conn.cursor()
+            with open(path, 'r') as file:
+                lines = file.readlines()
+            cursor.close()
     except Exception as e:
         print(f"Error loading sequences: {e}")
-    finally:
-        cursor.close()
-        conn.close()
 
 # keep track of all my friends games 
 # find what decks they lose too the most
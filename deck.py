@@ -0,0 +1,153 @@
+import numpy as np
+
+"""
+Compact deck representation.
+
+A battle-log deck is a list of 8 full card dicts (names, icon urls, ...).
+Deck keeps only what analysis needs: the 8 card codes (see CardCodec)
+sorted and packed one byte each into a single 64-bit key, a 256-bit bitset
+of the same cards for set operations, and the levels and evolution levels
+as 8 bytes each.
+
+Two decks are equal (and hash the same) when they hold the same cards, in
+any order and at any level:
+
+    codec = CardCodec()
+    deck = Deck.from_cards(player["cards"], codec)
+    deck.overlap(other)            # cards in common, one AND + popcount
+    counts = Counter(Deck.from_cards(p["cards"], codec) for p in players)
+
+For millions of decks skip the objects and work on arrays: pack() turns an
+(n, 8) array of codes into n uint64 keys, unpack() reverses it and
+one_hot() gives the (n, n_cards) membership matrix.
+"""
+
+SLOTS = 8
+EMPTY = 0xFF  # code of an empty slot, sorts after every real card
+SHIFTS = np.arange(SLOTS, dtype=np.uint64) * np.uint64(8)
+
+
+class Deck:
+    """
+    Args:
+        codes (iterable): Up to 8 card codes (0..254).
+        levels (iterable, optional): Card levels, in the same order as codes.
+        evolutions (iterable, optional): Evolution levels, in the same order as codes.
+    """
+    __slots__ = ("key", "bits", "levels", "evolutions")
+
+    def __init__(self, codes, levels=None, evolutions=None):
+        codes = [int(code) for code in codes]
+        if len(codes) > SLOTS:
+            raise ValueError(f"A deck holds at most {SLOTS} cards, got {len(codes)}")
+        if any(not 0 <= code < EMPTY for code in codes):
+            raise ValueError(f"Card codes must be in 0..{EMPTY - 1}: {codes}")
+        levels = [int(level or 0) for level in levels] if levels is not None else [0] * len(codes)
+        evolutions = [int(evolution or 0) for evolution in evolutions] if evolutions is not None else [0] * len(codes)
+
+        order = sorted(range(len(codes)), key=codes.__getitem__)
+        padding = SLOTS - len(codes)
+        self.key = 0
+        self.bits = 0
+        for slot, i in enumerate(order):
+            self.key |= codes[i] << (8 * slot)
+            self.bits |= 1 << codes[i]
+        for slot in range(len(codes), SLOTS):
+            self.key |= EMPTY << (8 * slot)
+        self.levels = bytes(levels[i] for i in order) + bytes(padding)
+        self.evolutions = bytes(evolutions[i] for i in order) + bytes(padding)
+
+    @classmethod
+    def from_cards(cls, cards, codec):
+        """Deck from a battle log player's "cards" list."""
+        return cls(
+            [codec.encode(card["id"]) for card in cards],
+            [card.get("level", 0) for card in cards],
+            [card.get("evolutionLevel", 0) for card in cards],
+        )
+
+    @classmethod
+    def from_key(cls, key, levels=None, evolutions=None):
+        """Rebuild a deck from its packed key (and its levels/evolutions, in key order)."""
+        codes = [code for code in ((key >> (8 * slot)) & 0xFF for slot in range(SLOTS)) if code != EMPTY]
+        return cls(codes, levels[:len(codes)] if levels else None, evolutions[:len(codes)] if evolutions else None)
+
+    @property
+    def codes(self):
+        """Card codes, ascending."""
+        return tuple(code for code in ((self.key >> (8 * slot)) & 0xFF for slot in range(SLOTS)) if code != EMPTY)
+
+    def card_ids(self, codec):
+        return [codec.decode(code) for code in self.codes]
+
+    def overlap(self, other):
+        """Number of cards the two decks share."""
+        return (self.bits & other.bits).bit_count()
+
+    def __contains__(self, code):
+        return bool(self.bits >> code & 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        return iter(self.codes)
+
+    def __eq__(self, other):
+        if not isinstance(other, Deck):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Deck({list(self.codes)})"
+
+
+def pack(codes):
+    """
+    (n, 8) array of card codes -> n uint64 deck keys. Rows may be in any
+    card order; short decks are padded with EMPTY.
+    """
+    codes = np.sort(np.asarray(codes, dtype=np.uint8), axis=1)
+    if codes.shape[1] < SLOTS:
+        padding = np.full((len(codes), SLOTS - codes.shape[1]), EMPTY, dtype=np.uint8)
+        codes = np.hstack([codes, padding])
+    return np.bitwise_or.reduce(codes.astype(np.uint64) << SHIFTS, axis=1)
+
+
+def unpack(keys):
+    """n uint64 deck keys -> (n, 8) uint8 array of card codes, ascending."""
+    keys = np.asarray(keys, dtype=np.uint64)
+    return ((keys[:, None] >> SHIFTS) & np.uint64(0xFF)).astype(np.uint8)
+
+
+def one_hot(codes, n_cards=EMPTY):
+    """(n, 8) array of card codes -> (n, n_cards) uint8 membership matrix, EMPTY slots ignored."""
+    codes = np.asarray(codes)
+    matrix = np.zeros((len(codes), n_cards + 1), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(codes)), codes.shape[1])
+    cols = np.minimum(codes.ravel(), n_cards)
+    matrix[rows, cols] = 1
+    return matrix[:, :n_cards]
+
+
+def to_arrays(decks):
+    """Decks -> (keys uint64 (n,), levels uint8 (n, 8), evolutions uint8 (n, 8))."""
+    keys = np.fromiter((deck.key for deck in decks), dtype=np.uint64, count=len(decks))
+    levels = np.frombuffer(b"".join(deck.levels for deck in decks), dtype=np.uint8).reshape(-1, SLOTS)
+    evolutions = np.frombuffer(b"".join(deck.evolutions for deck in decks), dtype=np.uint8).reshape(-1, SLOTS)
+    return keys, levels, evolutions
+
+
+def from_arrays(keys, levels=None, evolutions=None):
+    """Inverse of to_arrays()."""
+    decks = []
+    for i, key in enumerate(keys):
+        decks.append(Deck.from_key(
+            int(key),
+            list(levels[i]) if levels is not None else None,
+            list(evolutions[i]) if evolutions is not None else None,
+        ))
+    return decks
@@ -0,0 +1,236 @@
+import json
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from catalogue import CardCodec
+from storage import get_backend
+
+"""
+Columnar export of the battle store.
+
+Writes the battle, participant and deck tables as Parquet datasets
+partitioned by date and game mode (hive-style directories), with every
+deck's cards packed into a list of small integer codes (see CardCodec)
+instead of 8 rows of full card ids:
+
+    data/parquet/battles/date=2025-04-08/game_mode=Draft_Competitive/part-....parquet
+    data/parquet/participants/...
+    data/parquet/decks/...
+
+Exports are incremental: the battle_export table records every battle that
+has been exported, and each run writes the battles missing from it. Crawls
+store old battles late and concurrent ingests commit out of order, so
+neither battle_time nor an insert counter is a safe watermark. A run first
+claims the new battles in a short transaction of its own, then reads them
+back without holding any write lock while the Parquet files are written,
+and marks them done at the end. Battles claimed by a run that didn't
+finish are picked up again by the next one. Run one export at a time.
+
+load() reads back just the columns and partitions asked for:
+
+    decks = load("decks", columns=["player_tag", "cards"], dates=("2025-04-01", "2025-04-30"),
+                 game_modes=["Draft_Competitive"])
+"""
+
+parquet_path = "data/parquet"
+
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("game_mode", pa.string())]), flavor="hive")
+
+BATTLE_SCHEMA = pa.schema([
+    ("battle_id", pa.int64()),
+    ("battle_time", pa.string()),
+    ("type", pa.string()),
+    ("date", pa.string()),
+    ("game_mode", pa.string()),
+])
+PARTICIPANT_SCHEMA = pa.schema([
+    ("battle_id", pa.int64()),
+    ("player_tag", pa.string()),
+    ("team", pa.int8()),
+    ("crowns", pa.int8()),
+    ("trophies", pa.int32()),
+    ("trophy_change", pa.int16()),
+    ("date", pa.string()),
+    ("game_mode", pa.string()),
+])
+DECK_SCHEMA = pa.schema([
+    ("battle_id", pa.int64()),
+    ("player_tag", pa.string()),
+    ("cards", pa.list_(pa.uint8())),
+    ("levels", pa.list_(pa.uint8())),
+    ("evolutions", pa.list_(pa.uint8())),
+    ("date", pa.string()),
+    ("game_mode", pa.string()),
+])
+
+
+def _date(battle_time):
+    """'20250408T201512.000Z' -> '2025-04-08'"""
+    return f"{battle_time[0:4]}-{battle_time[4:6]}-{battle_time[6:8]}"
+
+
+def _rows(cursor, query, params, chunk_size):
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+class Exporter:
+    """
+    Args:
+        path (str): Root directory of the Parquet datasets.
+        backend (Backend, optional): Battle store to read from.
+        codec (CardCodec, optional): Card id <-> small code mapping, persisted alongside.
+        chunk_size (int): Rows fetched and written per batch.
+    """
+
+    def __init__(self, path=parquet_path, backend=None, codec=None, chunk_size=100_000):
+        self.path = path
+        self.backend = backend or get_backend()
+        self.codec = codec or CardCodec()
+        self.chunk_size = chunk_size
+        self.state_path = os.path.join(path, "export_state.json")
+
+    def _migrate(self, cursor):
+        """Mark battles covered by an old export_state.json battle_time watermark as exported."""
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, 'r') as file:
+            watermark = json.load(file).get("battle_time")
+        if watermark:
+            cursor.execute(self.backend.sql(
+                "INSERT IGNORE INTO battle_export (battle_id, run, done) SELECT battle_id, 0, 1 FROM battle WHERE battle_time <= %s"
+            ), [watermark])
+
+    def _write(self, name, batches, schema, run):
+        ds.write_dataset(
+            batches,
+            os.path.join(self.path, name),
+            schema=schema,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{run}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def _battles(self, cursor, run):
+        query = self.backend.sql(
+            "SELECT b.battle_id, b.battle_time, b.type, b.game_mode FROM battle b JOIN battle_export e ON e.battle_id = b.battle_id "
+            "WHERE e.run = %s ORDER BY b.battle_time"
+        )
+        for rows in _rows(cursor, query, [run], self.chunk_size):
+            yield pa.RecordBatch.from_pylist([
+                {"battle_id": bid, "battle_time": t, "type": kind, "date": _date(t), "game_mode": mode or "unknown"}
+                for bid, t, kind, mode in rows
+            ], schema=BATTLE_SCHEMA)
+
+    def _participants(self, cursor, run):
+        query = self.backend.sql("""
+            SELECT p.battle_id, p.player_tag, p.team, p.crowns, p.trophies, p.trophy_change, b.battle_time, b.game_mode
+            FROM participant p JOIN battle b ON b.battle_id = p.battle_id JOIN battle_export e ON e.battle_id = b.battle_id
+            WHERE e.run = %s
+        """)
+        for rows in _rows(cursor, query, [run], self.chunk_size):
+            yield pa.RecordBatch.from_pylist([
+                {"battle_id": bid, "player_tag": tag, "team": team, "crowns": crowns, "trophies": trophies,
+                 "trophy_change": change, "date": _date(t), "game_mode": mode or "unknown"}
+                for bid, tag, team, crowns, trophies, change, t, mode in rows
+            ], schema=PARTICIPANT_SCHEMA)
+
+    def _decks(self, cursor, run):
+        # One row per (battle, player) with the 8 slots folded into lists.
+        query = self.backend.sql("""
+            SELECT d.battle_id, d.player_tag, d.card_id, d.level, d.evolution_level, b.battle_time, b.game_mode
+            FROM deck_card d JOIN battle b ON b.battle_id = d.battle_id JOIN battle_export e ON e.battle_id = b.battle_id
+            WHERE e.run = %s
+            ORDER BY d.battle_id, d.player_tag, d.slot
+        """)
+        deck = None
+        decks = []
+        for rows in _rows(cursor, query, [run], self.chunk_size):
+            for bid, tag, card_id, level, evolution, t, mode in rows:
+                if deck is None or deck["battle_id"] != bid or deck["player_tag"] != tag:
+                    if deck is not None:
+                        decks.append(deck)
+                    deck = {"battle_id": bid, "player_tag": tag, "cards": [], "levels": [], "evolutions": [],
+                            "date": _date(t), "game_mode": mode or "unknown"}
+                deck["cards"].append(self.codec.encode(card_id))
+                deck["levels"].append(level or 0)
+                deck["evolutions"].append(evolution or 0)
+            # the last deck may continue in the next chunk, so hold it back
+            if decks:
+                yield pa.RecordBatch.from_pylist(decks, schema=DECK_SCHEMA)
+                decks = []
+        if deck is not None:
+            yield pa.RecordBatch.from_pylist([deck], schema=DECK_SCHEMA)
+
+    def export(self):
+        """Write every battle not exported yet. Returns the number of battles written."""
+        run = int(time.time() * 1000)
+        os.makedirs(self.path, exist_ok=True)
+        sql = self.backend.sql
+
+        self.backend.create_schema()
+        # claim, committed straight away so ingests aren't locked out while the files are written
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            self._migrate(cursor)
+            cursor.execute(sql("UPDATE battle_export SET run = %s WHERE done = 0"), [run])  # left by an unfinished run
+            cursor.execute(sql(
+                "INSERT IGNORE INTO battle_export (battle_id, run) SELECT b.battle_id, %s FROM battle b "
+                "LEFT JOIN battle_export e ON e.battle_id = b.battle_id WHERE e.battle_id IS NULL"
+            ), [run])
+            cursor.execute(sql("SELECT COUNT(*) FROM battle_export WHERE run = %s"), [run])
+            count = cursor.fetchone()[0]
+            cursor.close()
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        if not count:
+            return 0
+
+        # read only
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            self._write("battles", self._battles(cursor, run), BATTLE_SCHEMA, run)
+            self._write("participants", self._participants(cursor, run), PARTICIPANT_SCHEMA, run)
+            self._write("decks", self._decks(cursor, run), DECK_SCHEMA, run)
+            cursor.close()
+        self.codec.save()
+
+        with self.backend.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql("UPDATE battle_export SET done = 1 WHERE run = %s"), [run])
+            cursor.close()
+        return count
+
+
+def load(table, path=parquet_path, columns=None, dates=None, game_modes=None):
+    """
+    Read one exported table ('battles', 'participants' or 'decks') into pandas.
+
+    Args:
+        columns (list, optional): Only read these columns.
+        dates (tuple, optional): Inclusive ('YYYY-MM-DD', 'YYYY-MM-DD') range; only
+            matching date partitions are opened.
+        game_modes (list, optional): Only read these game mode partitions.
+    """
+    dataset = ds.dataset(os.path.join(path, table), format="parquet", partitioning=PARTITIONING)
+    condition = None
+    if dates is not None:
+        start, end = dates
+        condition = (ds.field("date") >= start) & (ds.field("date") <= end)
+    if game_modes is not None:
+        mode_condition = ds.field("game_mode").isin(list(game_modes))
+        condition = mode_condition if condition is None else condition & mode_condition
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+if __name__ == "__main__":
+    written = Exporter().export()
+    print(f"Exported {written} battles to {parquet_path}")
@@ -1,37 +1,28 @@
 import cv2 as cv
-import pyautogui as pg
 from pynput import keyboard
-import numpy as np
 import os
 import time
 
+from capture import Capture
+
 player_dim = (0, 600, 450, 625)
 opponent_dim = (0, 600, 225, 325)
 
+capture = None
 
-def take_screenshot(dim):
-    # Use pyautogui or similar library to take a screenshot
-
-    screenshot = pg.screenshot()
-    # screenshot.save("screenshot.png")
-    # screenshot = cv.imread("screenshot.png")
 
-    # Load the screenshot using OpenCV
-    screenshot = np.array(screenshot)
-    img = cv.cvtColor(screenshot, cv.COLOR_BGR2GRAY)
-    if len(dim) == 4:
-        x1, x2, y1, y2 = dim
-        img = img[y1:y2, x1:x2]
-    else:
-        x1, x2 = dim
-        img = img[:, x1:x2]
+def get_capture():
+    # one grab per keypress for both strips, see capture.py
+    global capture
+    if capture is None:
+        capture = Capture({"player": player_dim, "opponent": opponent_dim})
+    return capture
 
-    # Save the cropped image
-    return img
 
-    # cv.imshow("Cropped Image", img)
-    # cv.waitKey(0)
-    # cv.destroyAllWindows()
+def take_screenshot(dim):
+    """Grayscale crop of one region of the screen (grab() gets several at once), None when a replay has run out."""
+    regions = Capture({"region": dim}, get_capture().backend).grab()
+    return None if regions is None else regions["region"]
 
 
 space_pressed = False
@@ -66,10 +57,12 @@ def main():
             # Spacebar was just pressed down
             i += 1
             print(f"Capturing frame {i}")  # Optional feedback
-            player = take_screenshot(player_dim)
-            cv.imwrite(f"{dirpath}/player_{i}.png", player)
-            opponent = take_screenshot(opponent_dim)
-            cv.imwrite(f"{dirpath}/opponent_{i}.png", opponent)
+            regions = get_capture().grab()
+            if regions is None:
+                print("Replay finished, nothing left to capture")
+                break
+            cv.imwrite(f"{dirpath}/player_{i}.png", regions["player"])
+            cv.imwrite(f"{dirpath}/opponent_{i}.png", regions["opponent"])
             enter_bar_pressed = True  # Update the state
         time.sleep(.05)
 
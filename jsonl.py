@@ -0,0 +1,145 @@
+import gzip
+import io
+import json
+import sys
+from itertools import islice
+
+"""
+Streaming line-delimited JSON.
+
+Crawl dumps are JSONL files, one battle per line (or one whole battle log
+per line, e.g. checkpoint.sweep_battle_logs' output, which is flattened),
+optionally gzip (.gz) or zstandard (.zst) compressed. read() parses one
+line at a time and write() appends one record per line, so a dump of any
+size is handled in constant memory.
+
+Battles are projected down to the fields the battle store keeps before
+anything else is done with them:
+
+    store = BattleStore()
+    ingest("data/dumps/battles-2025-04.jsonl.zst", store)
+
+.zst files need the optional zstandard package (pip install zstandard).
+"""
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading or writing .zst files requires the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def open_stream(path, mode='r'):
+    """Open a text stream, compressed or not depending on the file extension ('r', 'w' or 'a')."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + 't', encoding="utf-8")
+    if path.endswith(".zst"):
+        zstandard = _zstd()
+        if mode == 'r':
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        else:
+            # appending adds a second zstd frame, which readers decode transparently
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, mode + 'b'), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def project_battle(battle):
+    """Keep only battleTime, type, gameMode and each player's tag, crowns, trophies and card ids/levels."""
+    projected = {
+        "battleTime": battle["battleTime"],
+        "type": battle.get("type"),
+        "gameMode": {"name": battle.get("gameMode", {}).get("name")},
+    }
+    for side in ("team", "opponent"):
+        projected[side] = [
+            {
+                "tag": player["tag"],
+                "crowns": player.get("crowns"),
+                "startingTrophies": player.get("startingTrophies"),
+                "trophyChange": player.get("trophyChange"),
+                "cards": [
+                    {"id": card["id"], "level": card.get("level"), "evolutionLevel": card.get("evolutionLevel", 0)}
+                    for card in player.get("cards", [])
+                ],
+            }
+            for player in battle.get(side, [])
+        ]
+    return projected
+
+
+def read(path, project=None):
+    """
+    Yield the records in a JSONL file one at a time.
+
+    Args:
+        path (str): File to read (.jsonl, .jsonl.gz or .jsonl.zst).
+        project (function, optional): Applied to every record, e.g. project_battle.
+            Records it fails on are skipped.
+
+    A whole battle log on one line, as a list or as checkpoint.sweep_battle_logs'
+    {"tag": ..., "battles": [...]}, yields each battle.
+    """
+    with open_stream(path, 'r') as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as err:
+                print(f"Skipping {path}:{number}: {err}")
+                continue
+            if isinstance(record, dict) and "battles" in record and "battleTime" not in record:
+                record = record["battles"]
+            for item in (record if isinstance(record, list) else [record]):
+                if project is None:
+                    yield item
+                    continue
+                try:
+                    projected = project(item)
+                except (KeyError, TypeError, AttributeError) as err:
+                    print(f"Skipping record in {path}:{number}: {type(err).__name__}: {err}")
+                    continue
+                yield projected
+
+
+def write(path, records, mode='a'):
+    """Write records one per line. Returns the number written."""
+    count = 0
+    with open_stream(path, mode) as file:
+        for record in records:
+            file.write(json.dumps(record, separators=(",", ":")))
+            file.write("\n")
+            count += 1
+    return count
+
+
+def batches(records, size):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest(path, store, batch_size=1000):
+    """
+    Stream the battles in a dump into a BattleStore, batch_size at a time.
+    Returns the number of new battles stored.
+    """
+    new = 0
+    for batch in batches(read(path, project_battle), batch_size):
+        new += store.ingest(batch)
+    return new
+
+
+if __name__ == "__main__":
+    from battles import BattleStore
+
+    store = BattleStore()
+    for path in sys.argv[1:]:
+        print(f"{path}: {ingest(path, store)} new battles")
+    print(store.stats)
@@ -0,0 +1,282 @@
+import os
+from collections import Counter
+from itertools import combinations, product
+
+from catalogue import slug
+
+"""
+Frequent card sets and pick patterns in triple draft.
+
+tracker.py / trippleDraft.py want to "identify sequences of card types",
+"find the most common cards in a sequence" and "find what cards owen will
+pick". The recorded drafts are plain text:
+
+    sequences.txt   one offer of 3 cards per line, rounds separated by blank
+                    lines and drafts by a line of '-'. Prefixing a card with
+                    '*' records it as the one picked from that offer.
+    me.txt, ...     the 8 picks of each draft, one per line, drafts
+                    separated by a line of dashes.
+
+ItemsetMiner is Eclat over bitsets: every card keeps the set of transactions
+containing it as one Python int, so the support of a card set is an AND and
+a popcount, and adding drafts only sets bits.
+
+    miner = ItemsetMiner()
+    for picks in read_picks(me_path):
+        miner.add(picks)
+    miner.frequent(min_support=0.05, max_size=3)
+    miner.rules(min_support=0.05, min_confidence=0.6)
+"""
+
+sequences_path = "data/trippledraft/sequences.txt"
+me_path = "data/trippledraft/me.txt"
+echo_path = "data/trippledraft/echo.txt"
+types_path = "data/trippledraft/types"
+
+# spellings used in the hand-written files -> catalogue slugs
+ALIASES = {
+    "xbow": "x-bow",
+    "goblin-barrell": "goblin-barrel",
+    "phenoix": "phoenix",
+    "elixer-collector": "elixir-collector",
+    "earth-quake": "earthquake",
+    "fire-cracker": "firecracker",
+    "log": "the-log",
+    "sparkies": "sparky",
+}
+
+
+def card_slug(name):
+    """'Goblin Barrell ' -> 'goblin-barrel'"""
+    key = slug(name.strip())
+    return ALIASES.get(key, key)
+
+
+def _is_separator(line):
+    return line and set(line) == {"-"}
+
+
+def read_picks(path):
+    """Drafts as lists of picked card slugs, in pick order."""
+    drafts = []
+    draft = []
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if _is_separator(line):
+                if draft:
+                    drafts.append(draft)
+                draft = []
+            elif line:
+                draft.append(card_slug(line))
+    if draft:
+        drafts.append(draft)
+    return drafts
+
+
+def read_offers(path):
+    """
+    Drafts as lists of (offer, pick): offer is a tuple of 3 card slugs, pick
+    the slug marked with '*' or None when the pick wasn't recorded.
+    """
+    drafts = []
+    draft = []
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if _is_separator(line):
+                if draft:
+                    drafts.append(draft)
+                draft = []
+            elif line:
+                offer = []
+                pick = None
+                for name in line.split(","):
+                    if not name.strip():
+                        continue
+                    picked = name.strip().startswith("*")
+                    card = card_slug(name.strip().lstrip("*"))
+                    offer.append(card)
+                    if picked:
+                        pick = card
+                draft.append((tuple(offer), pick))
+    if draft:
+        drafts.append(draft)
+    return drafts
+
+
+def load_types(path=types_path):
+    """{card slug: set of type names} from the type lists (wincon.txt, antiair.txt, ...)."""
+    types = {}
+    for name in sorted(os.listdir(path)):
+        kind = name.split(".")[0]
+        with open(os.path.join(path, name), 'r') as file:
+            for line in file:
+                if line.strip():
+                    types.setdefault(card_slug(line), set()).add(kind)
+    return types
+
+
+class ItemsetMiner:
+    """Vertical (item -> transaction bitset) store of transactions, mined with Eclat."""
+
+    def __init__(self):
+        self.transactions = 0
+        self.bits = {}
+
+    def add(self, items):
+        """Add one transaction (a set of cards). Duplicates within it count once."""
+        bit = 1 << self.transactions
+        for item in set(items):
+            self.bits[item] = self.bits.get(item, 0) | bit
+        self.transactions += 1
+
+    def update(self, transactions):
+        for items in transactions:
+            self.add(items)
+
+    def _min_count(self, min_support):
+        # a float is a share of transactions, an int an absolute count
+        if isinstance(min_support, float):
+            return max(1, int(min_support * self.transactions + 0.999999))
+        return min_support
+
+    def support(self, items):
+        """Transactions containing every item."""
+        bits = -1
+        for item in items:
+            bits &= self.bits.get(item, 0)
+        return bits.bit_count() if items else self.transactions
+
+    def frequent(self, min_support=0.05, max_size=3):
+        """{frozenset of cards: count} for every card set in at least min_support transactions."""
+        min_count = self._min_count(min_support)
+        found = {}
+        level = sorted(
+            ((item, bits) for item, bits in self.bits.items() if bits.bit_count() >= min_count),
+            key=lambda entry: entry[0]
+        )
+
+        def extend(prefix, candidates):
+            for i, (item, bits) in enumerate(candidates):
+                itemset = prefix + (item,)
+                found[frozenset(itemset)] = bits.bit_count()
+                if len(itemset) >= max_size:
+                    continue
+                branch = []
+                for other, other_bits in candidates[i + 1:]:
+                    common = bits & other_bits
+                    if common.bit_count() >= min_count:
+                        branch.append((other, common))
+                if branch:
+                    extend(itemset, branch)
+
+        extend((), level)
+        return found
+
+    def rules(self, min_support=0.05, min_confidence=0.5, max_size=3):
+        """
+        Association rules antecedent -> consequent between frequent card sets,
+        as [(antecedent, consequent, support, confidence, lift)], most confident first.
+        """
+        itemsets = self.frequent(min_support, max_size)
+        rules = []
+        for itemset, count in itemsets.items():
+            if len(itemset) < 2:
+                continue
+            for size in range(1, len(itemset)):
+                for antecedent in combinations(sorted(itemset), size):
+                    antecedent = frozenset(antecedent)
+                    consequent = itemset - antecedent
+                    confidence = count / itemsets[antecedent]
+                    if confidence >= min_confidence:
+                        lift = confidence / (itemsets[consequent] / self.transactions)
+                        rules.append((antecedent, consequent, count / self.transactions, confidence, lift))
+        rules.sort(key=lambda rule: (-rule[3], -rule[2]))
+        return rules
+
+
+class PickStats:
+    """
+    Offer -> pick patterns: how often each card is offered and picked, and
+    for every pair offered together how often one was taken over the other.
+    """
+
+    def __init__(self):
+        self.offered = Counter()
+        self.picked = Counter()
+        self.beats = Counter()
+        self.offers = Counter()
+        self.shown = Counter()
+
+    def add(self, offer, pick):
+        offer = tuple(offer)
+        self.offered.update(offer)
+        self.offers[(frozenset(offer), pick)] += 1
+        if pick is None:
+            return
+        self.picked[pick] += 1
+        self.shown.update(offer)
+        for other in offer:
+            if other != pick:
+                self.beats[(pick, other)] += 1
+
+    def update(self, drafts):
+        for draft in drafts:
+            for offer, pick in draft:
+                self.add(offer, pick)
+
+    def pick_rate(self, card):
+        """Share of the offers containing card (with a recorded pick) where it was picked."""
+        shown = self.shown[card]
+        return self.picked[card] / shown if shown else None
+
+    def preference(self, a, b):
+        """How often a was picked when offered together with b and one of them was taken."""
+        won, lost = self.beats[(a, b)], self.beats[(b, a)]
+        return won / (won + lost) if won + lost else None
+
+    def patterns(self, min_count=2):
+        """[(offer, pick, count, confidence)] of recorded offer -> pick outcomes, most frequent first."""
+        totals = Counter()
+        for (offer, pick), count in self.offers.items():
+            if pick is not None:
+                totals[offer] += count
+        found = [
+            (offer, pick, count, count / totals[offer])
+            for (offer, pick), count in self.offers.items()
+            if pick is not None and count >= min_count
+        ]
+        found.sort(key=lambda pattern: (-pattern[2], -pattern[3]))
+        return found
+
+
+def type_sequences(drafts, types, n=2):
+    """
+    Counter of n-grams of card types along the pick order, e.g.
+    ('wincon', 'smallspell'). A card with several types counts under each.
+    """
+    grams = Counter()
+    for picks in drafts:
+        kinds = [sorted(types.get(card, ())) or ["other"] for card in picks]
+        for i in range(len(kinds) - n + 1):
+            grams.update(product(*kinds[i:i + n]))
+    return grams
+
+
+if __name__ == "__main__":
+    picks = read_picks(me_path) + read_picks(echo_path)
+    offers = read_offers(sequences_path)
+
+    miner = ItemsetMiner()
+    miner.update(picks)
+    offer_miner = ItemsetMiner()
+    offer_miner.update(offer for draft in offers for offer, _ in draft)
+
+    print(f"{len(picks)} pick drafts, {sum(len(draft) for draft in offers)} offers")
+    for itemset, count in sorted(miner.frequent(0.2, 2).items(), key=lambda entry: -entry[1])[:15]:
+        print(count, sorted(itemset))
+    for antecedent, consequent, support, confidence, lift in miner.rules(0.2, 0.6)[:10]:
+        print(f"{sorted(antecedent)} -> {sorted(consequent)} support {support:.2f} confidence {confidence:.2f} lift {lift:.2f}")
+    for gram, count in type_sequences(picks, load_types()).most_common(10):
+        print(count, gram)
@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from mining import PickStats, card_slug, echo_path, me_path, read_offers, read_picks, sequences_path
+from scheduler import load_players
+
+"""
+Draft pick predictor.
+
+"find what cards owen will pick depending on what I am given" (trippleDraft.py):
+given a player's tag and the 3 cards on offer, rank the cards by how
+likely that player is to take each of them.
+
+Every model is a float32 table of shape (n + 1, n) over the card vocabulary:
+row 0 holds each card's pick strength and rows 1..n the pairwise
+adjustments (row a, column b > 0 when a is taken over b more often than the
+strengths alone say). The probability of picking a card is a softmax
+over the strengths of the offered cards plus their pairwise terms.
+
+    global.npy  card_data.csv ratings plus every recorded draft
+    <TAG>.npy   the global model shifted towards one player's own picks
+
+build() writes the tables and the predictor memory-maps them, so a lookup
+is a few array reads. Rebuilding replaces the files atomically and
+predictors pick the new ones up on their next call.
+
+    build()
+    predictor = Predictor()
+    predictor.predict("#C00Y2PJ9", ["hog rider", "fireball", "knight"])
+"""
+
+models_path = "data/models"
+card_stats_path = "data/trippledraft/card_data.csv"
+
+# who recorded which picks file (names as in data/tags/players.txt)
+PICK_FILES = {
+    "cheifburger": me_path,
+    "echo": echo_path,
+}
+
+
+def model_file(path, tag=None):
+    if tag is None:
+        return os.path.join(path, "global.npy")
+    return os.path.join(path, re.sub(r"[^0-9A-Z]", "", tag.upper()) + ".npy")
+
+
+def read_ratings(path=card_stats_path):
+    """{card slug: rating} from card_data.csv."""
+    df = pd.read_csv(path, skipinitialspace=True)
+    return {card_slug(card): rating for card, rating in zip(df["card"], df["rating"])}
+
+
+def _save(path, table):
+    tmp = f"{path}.tmp.npy"
+    np.save(tmp, table.astype(np.float32))
+    os.replace(tmp, path)  # readers keep their old mapping until they reload
+
+
+class ModelBuilder:
+    """
+    Args:
+        vocab (list): Card slugs, one row/column each.
+        prior_weight (float): Weight of the card_data.csv rating in the strengths.
+        smoothing (float): Pseudo-count added to pick and pair counts.
+    """
+
+    def __init__(self, vocab, prior_weight=2.0, smoothing=1.0):
+        self.vocab = list(vocab)
+        self.index = {card: i for i, card in enumerate(self.vocab)}
+        self.prior_weight = prior_weight
+        self.smoothing = smoothing
+
+    def table(self, ratings=None, picks=(), offers=(), base=None, shrink=1.0):
+        """
+        Args:
+            ratings (dict, optional): {slug: rating} prior.
+            picks (list): Drafts as lists of picked slugs.
+            offers (list): Drafts as lists of (offer, pick).
+            base (array, optional): Table to start from (the global model for a player).
+            shrink (float): How far the counts move the table away from base.
+        """
+        n = len(self.vocab)
+        table = np.zeros((n + 1, n), dtype=np.float64) if base is None else np.array(base, dtype=np.float64)
+
+        if ratings:
+            values = np.array([ratings.get(card, np.nan) for card in self.vocab])
+            known = ~np.isnan(values)
+            if known.sum() > 1:
+                z = (values[known] - values[known].mean()) / (values[known].std() or 1)
+                table[0, known] += self.prior_weight * z
+
+        picked = np.zeros(n)
+        for draft in picks:
+            for card in draft:
+                if card in self.index:
+                    picked[self.index[card]] += 1
+        if picked.sum():
+            expected = picked.sum() / n
+            table[0] += shrink * np.log((picked + self.smoothing) / (expected + self.smoothing))
+
+        stats = PickStats()
+        stats.update(offers)
+        for (a, b), count in stats.beats.items():
+            if a in self.index and b in self.index:
+                i, j = self.index[a], self.index[b]
+                lost = stats.beats[(b, a)]
+                table[1 + i, j] += shrink * np.log((count + self.smoothing) / (lost + self.smoothing))
+        return table
+
+
+def build(path=models_path, ratings_path=card_stats_path, pick_files=None, offers_path=sequences_path, players_path=None):
+    """
+    Write the vocabulary, the global model and one model per player with a
+    picks file. Returns the tags that got a model.
+    """
+    os.makedirs(path, exist_ok=True)
+    pick_files = PICK_FILES if pick_files is None else pick_files
+    players = load_players(players_path) if players_path else load_players()
+
+    ratings = read_ratings(ratings_path)
+    picks = {name: read_picks(file) for name, file in pick_files.items() if os.path.exists(file)}
+    offers = read_offers(offers_path) if os.path.exists(offers_path) else []
+
+    vocab = set(ratings)
+    for drafts in picks.values():
+        vocab.update(card for draft in drafts for card in draft)
+    vocab.update(card for draft in offers for offer, _ in draft for card in offer)
+    vocab = sorted(vocab)
+
+    builder = ModelBuilder(vocab)
+    everything = [draft for drafts in picks.values() for draft in drafts]
+    base = builder.table(ratings, everything, offers)
+
+    with open(os.path.join(path, "vocab.json.tmp"), 'w') as file:
+        json.dump(vocab, file)
+    os.replace(os.path.join(path, "vocab.json.tmp"), os.path.join(path, "vocab.json"))
+    _save(model_file(path), base)
+
+    tags = []
+    for name, drafts in picks.items():
+        tag = players.get(name)
+        if tag is None:
+            print(f"No tag for {name} in players.txt, skipping their model")
+            continue
+        _save(model_file(path, tag), builder.table(picks=drafts, base=base, shrink=0.5))
+        tags.append(tag)
+    return tags
+
+
+class Predictor:
+    """
+    Args:
+        path (str): Directory written by build().
+        check_interval (float): Seconds between checks for rebuilt model files.
+    """
+
+    def __init__(self, path=models_path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.models = {}  # file -> (mtime, memory-mapped table)
+        self.checked = {}
+        self.warned = set()
+        self.vocab_mtime = None
+        self.index = {}
+        self._load_vocab()
+
+    def _load_vocab(self):
+        vocab_path = os.path.join(self.path, "vocab.json")
+        mtime = os.stat(vocab_path).st_mtime_ns
+        if mtime != self.vocab_mtime:
+            with open(vocab_path, 'r') as file:
+                self.index = {card: i for i, card in enumerate(json.load(file))}
+            self.vocab_mtime = mtime
+            self.models = {}
+
+    def _model(self, file):
+        now = time.monotonic()
+        entry = self.models.get(file)
+        if entry is not None and now - self.checked.get(file, 0) < self.check_interval:
+            return entry[1]
+        self.checked[file] = now
+        self._load_vocab()  # drops every mapped table when the vocabulary changed
+        entry = self.models.get(file)
+        try:
+            mtime = os.stat(file).st_mtime_ns
+        except FileNotFoundError:
+            self.models.pop(file, None)
+            return None
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, np.load(file, mmap_mode='r'))
+        if entry[1].shape[1] != len(self.index):
+            # written by a different build() than vocab.json, e.g. one still running
+            self.models.pop(file, None)
+            return None
+        self.models[file] = entry
+        return entry[1]
+
+    def model(self, tag=None):
+        """The player's table, falling back to the global one (with a warning, once per tag)."""
+        table = self._model(model_file(self.path, tag)) if tag else None
+        if tag and table is None and tag not in self.warned:
+            self.warned.add(tag)
+            print(f"No pick model for {tag}, using the global model (is the tag right in players.txt?)")
+        return table if table is not None else self._model(model_file(self.path))
+
+    def predict(self, tag, offer):
+        """[(card slug, probability)] for the offered cards, most likely pick first. None cards are skipped."""
+        cards = [card_slug(card) for card in offer if card is not None]
+        if not cards:
+            return []
+        table = self.model(tag)
+        known = [self.index.get(card) for card in cards]
+        scores = np.zeros(len(cards))
+        rows = [i for i, index in enumerate(known) if index is not None]
+        if rows and table is not None:
+            idx = np.array([known[i] for i in rows])
+            scores[rows] = table[0, idx] + table[1 + idx][:, idx].sum(axis=1)
+        scores = np.exp(scores - scores.max())
+        scores /= scores.sum()
+        order = np.argsort(-scores, kind="stable")
+        return [(cards[i], float(scores[i])) for i in order]
+
+
+if __name__ == "__main__":
+    print(f"Built models for {build()}")
+    predictor = Predictor()
+    print(predictor.predict(None, ["mega knight", "hog rider", "the log"]))
@@ -0,0 +1,179 @@
+import glob
+import os
+import sys
+import time
+
+import cv2 as cv
+import numpy as np
+
+from catalogue import evolutions_path, names_path, slug
+
+"""
+Fast card recognition for captured card strips.
+
+Every card in names.txt (plus the evolved art of the cards in
+evolutions.txt) is reduced once to a small grayscale feature vector and a
+64-bit perceptual hash. The vectors are stacked into one array, so
+classifying the 3 slots of a strip takes one matrix product against all the
+cards at once instead of one cv.matchTemplate call per card.
+
+Template art is read from data/cards/templates/<slug>.png and
+<slug>-evolution.png. The built index is saved to data/cards/templates.npz:
+
+    python recognition.py build
+    python recognition.py bench data/sequence_3     # frames saved by img_processing.py
+
+    recognizer = CardRecognizer.load()
+    recognizer.recognize(strip)                      # ['hog-rider', 'fireball', 'knight']
+"""
+
+templates_path = "data/cards/templates"
+index_path = "data/cards/templates.npz"
+EVOLUTION = "-evolution"
+
+
+def features(images, size):
+    """Grayscale images -> (n, w*h) float32 rows, zero mean and unit length (so a dot product is the NCC)."""
+    rows = np.stack([
+        cv.resize(image, size, interpolation=cv.INTER_AREA).astype(np.float32).ravel()
+        for image in images
+    ])
+    rows -= rows.mean(axis=1, keepdims=True)
+    rows /= np.linalg.norm(rows, axis=1, keepdims=True) + 1e-6
+    return rows
+
+
+def phashes(images):
+    """Grayscale images -> (n, 8) uint8 packed 64-bit DCT perceptual hashes."""
+    hashes = []
+    for image in images:
+        small = cv.resize(image, (32, 32), interpolation=cv.INTER_AREA).astype(np.float32)
+        low = cv.dct(small)[:8, :8].ravel()
+        hashes.append(np.packbits(low > np.median(low[1:])))
+    return np.stack(hashes)
+
+
+def base_card(label):
+    """'knight-evolution' -> 'knight'"""
+    return label[:-len(EVOLUTION)] if label.endswith(EVOLUTION) else label
+
+
+def split_slots(strip, slots=3):
+    """Cut a horizontal strip into equal-width card images."""
+    width = strip.shape[1] // slots
+    return [strip[:, i * width:(i + 1) * width] for i in range(slots)]
+
+
+class CardRecognizer:
+    """
+    Args:
+        labels (list): Template label per row ('knight' or 'knight-evolution').
+        vectors (array): (n, w*h) features of the templates.
+        hashes (array): (n, 8) perceptual hashes of the templates.
+        size (tuple): (width, height) the features were computed at.
+        slots (int): Cards per strip.
+        min_score (float): Below this correlation a slot is reported as None.
+    """
+
+    def __init__(self, labels, vectors, hashes, size=(24, 30), slots=3, min_score=0.3):
+        self.labels = list(labels)
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.hashes = np.asarray(hashes, dtype=np.uint8)
+        self.size = tuple(size)
+        self.slots = slots
+        self.min_score = min_score
+
+    @classmethod
+    def build(cls, path=templates_path, names=names_path, evolutions=evolutions_path, size=(24, 30), **kwargs):
+        """Index the template art of every card in names.txt and evolutions.txt."""
+        with open(names, 'r') as file:
+            wanted = list(dict.fromkeys(slug(line) for line in file if line.strip()))
+        with open(evolutions, 'r') as file:
+            wanted += [slug(line) + EVOLUTION for line in file if line.strip()]
+
+        labels, images, missing = [], [], []
+        for label in wanted:
+            file = os.path.join(path, f"{label}.png")
+            image = cv.imread(file, cv.IMREAD_GRAYSCALE) if os.path.exists(file) else None
+            if image is None:
+                missing.append(label)
+                continue
+            labels.append(label)
+            images.append(image)
+        if missing:
+            print(f"No template for {len(missing)} cards: {', '.join(missing)}")
+        if not images:
+            raise ValueError(f"No card templates found in {path}")
+        return cls(labels, features(images, size), phashes(images), size, **kwargs)
+
+    def save(self, path=index_path):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, labels=np.array(self.labels), vectors=self.vectors, hashes=self.hashes, size=np.array(self.size))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=index_path, **kwargs):
+        with np.load(path) as saved:
+            return cls(saved["labels"].tolist(), saved["vectors"], saved["hashes"], tuple(saved["size"].tolist()), **kwargs)
+
+    def classify(self, images):
+        """[(label, score)] for each card image, score being the normalized correlation."""
+        scores = self.vectors @ features(images, self.size).T
+        best = scores.argmax(axis=0)
+        return [(self.labels[row], float(scores[row, i])) for i, row in enumerate(best)]
+
+    def classify_hash(self, images):
+        """[(label, hamming distance)] using the perceptual hashes only."""
+        distances = np.unpackbits(self.hashes[:, None, :] ^ phashes(images)[None, :, :], axis=2).sum(axis=2)
+        best = distances.argmin(axis=0)
+        return [(self.labels[row], int(distances[row, i])) for i, row in enumerate(best)]
+
+    def recognize(self, strip):
+        """Card slugs in the strip's slots, None where nothing matched well enough."""
+        results = []
+        for label, score in self.classify(split_slots(strip, self.slots)):
+            results.append(base_card(label) if score >= self.min_score else None)
+        return results
+
+
+def benchmark(folder, recognizer, baseline=None, repeat=1):
+    """
+    Time recognizer over every PNG strip in folder. With a baseline recognizer
+    (e.g. advisor.TemplateRecognizer) also time it and report how often they agree.
+    """
+    strips = [cv.imread(path, cv.IMREAD_GRAYSCALE) for path in sorted(glob.glob(os.path.join(folder, "*.png")))]
+    strips = [strip for strip in strips if strip is not None]
+    if not strips:
+        print(f"No frames in {folder}")
+        return None
+
+    def run(target):
+        times, results = [], []
+        for _ in range(repeat):
+            for strip in strips:
+                start = time.perf_counter()
+                results.append(target.recognize(strip))
+                times.append((time.perf_counter() - start) * 1000)
+        return np.array(times), results
+
+    times, results = run(recognizer)
+    report = {"frames": len(strips), "mean_ms": times.mean(), "p50_ms": np.percentile(times, 50), "p95_ms": np.percentile(times, 95)}
+    if baseline is not None:
+        baseline_times, baseline_results = run(baseline)
+        report["baseline_mean_ms"] = baseline_times.mean()
+        report["agreement"] = float(np.mean([a == b for a, b in zip(results, baseline_results)]))
+    for key, value in report.items():
+        print(f"{key:18} {value:.3f}" if isinstance(value, float) else f"{key:18} {value}")
+    return report
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["build"]:
+        recognizer = CardRecognizer.build()
+        recognizer.save()
+        print(f"Indexed {len(recognizer.labels)} templates into {index_path}")
+    elif sys.argv[1:2] == ["bench"]:
+        from advisor import TemplateRecognizer
+        benchmark(sys.argv[2], CardRecognizer.load(), TemplateRecognizer())
+    else:
+        print("usage: python recognition.py build | bench <folder>")
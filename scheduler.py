@@ -0,0 +1,137 @@
+import heapq
+import threading
+import time
+
+from API.ratelimit import TokenBucket
+
+"""
+Adaptive polling scheduler for tracked players.
+
+Players sit in a heap ordered by their next poll time, which SyncEngine
+derives from how often they play: active players come back around quickly,
+dormant ones back off towards max_interval. Each cycle only pops the players
+that are actually due, so tens of thousands of tags cost nothing until their
+turn comes up. A global per-minute request budget caps the total poll rate
+regardless of how many players are due at once.
+
+    engine = SyncEngine(token, ingest=upload)
+    scheduler = Scheduler(engine, budget_per_minute=600)
+    scheduler.add(load_players().values())
+    scheduler.run()
+"""
+
+players_path = "data/tags/players.txt"
+
+
+def load_players(path=players_path):
+    """
+    Read 'name #TAG' lines into a {name: tag} dict.
+    """
+    players = {}
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            name, _, tag = line.rpartition(" ")
+            players[name or tag] = tag
+    return players
+
+
+class Scheduler:
+    """
+    Args:
+        engine (SyncEngine): Does the polling and decides each player's next poll time.
+        budget_per_minute (int): Maximum battle-log requests per minute across all players.
+        workers (int): Threads polling in parallel, useful when request latency
+            rather than the budget is the bottleneck.
+    """
+
+    def __init__(self, engine, budget_per_minute=300, workers=1):
+        self.engine = engine
+        rate = budget_per_minute / 60
+        self.budget = TokenBucket(rate, capacity=max(1, rate))
+        self.workers = workers
+        self.heap = []
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.polls = 0
+        self.errors = {}  # tag -> consecutive failed polls
+
+    def add(self, tags):
+        """Track tags and queue them at their stored next poll time (new tags are due now)."""
+        tags = list(tags)
+        self.engine.track(tags)
+        for tag in tags:
+            self.push(tag, self.engine.state(tag).next_poll)
+
+    def push(self, tag, when):
+        with self.lock:
+            if tag in self.queued:
+                return
+            self.queued.add(tag)
+            heapq.heappush(self.heap, (when, tag))
+
+    def pop_due(self, now):
+        """Pop the most overdue tag, or return (None, seconds until the next one is due)."""
+        with self.lock:
+            if not self.heap:
+                return None, None
+            when, tag = self.heap[0]
+            if when > now:
+                return None, when - now
+            heapq.heappop(self.heap)
+            self.queued.discard(tag)
+            return tag, 0
+
+    def step(self, now=None):
+        """
+        Poll at most one due player. Returns True if a player was polled,
+        otherwise the number of seconds until one is due (None when idle).
+        """
+        now = time.time() if now is None else now
+        tag, wait = self.pop_due(now)
+        if tag is None:
+            return wait
+        self.budget.acquire()
+        try:
+            self.engine.sync(tag)
+        except Exception as e:
+            with self.lock:
+                self.polls += 1
+                failures = self.errors[tag] = self.errors.get(tag, 0) + 1
+            delay = min(self.engine.max_interval, self.engine.min_interval * 2 ** (failures - 1))
+            print(f"Error polling {tag} ({failures} in a row), retrying in {delay:.0f}s: {e}")
+            self.push(tag, time.time() + delay)
+            return True
+        with self.lock:
+            self.polls += 1
+            self.errors.pop(tag, None)
+        self.push(tag, self.engine.state(tag).next_poll)
+        return True
+
+    def _work(self, max_sleep):
+        while not self.stopped.is_set():
+            result = self.step()
+            if result is True:
+                continue
+            self.stopped.wait(max_sleep if result is None else min(result, max_sleep))
+
+    def run(self, max_sleep=1.0):
+        """Poll forever (until stop() is called or Ctrl-C)."""
+        threads = [threading.Thread(target=self._work, args=(max_sleep,), daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=max_sleep)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        self.stopped.set()
+
+    def __len__(self):
+        return len(self.heap)
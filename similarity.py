@@ -0,0 +1,188 @@
+import numpy as np
+
+from cooccurrence import codes_array, load_decks
+from deck import EMPTY, Deck, pack, unpack
+
+"""
+Deck similarity index.
+
+"compare them to real high rating decks" (data.py) and "find log bait decks"
+(_.py) both need the stored decks closest to a given one. Comparing a deck
+against millions of others pair by pair is too slow, so DeckIndex keeps:
+
+- every distinct deck once, with how often it was played (and won),
+- each deck's cards as a 256-bit bitset, for exact Jaccard similarity,
+- MinHash signatures split into LSH bands, stored as sorted arrays, so a
+  query only scores decks that share at least one band with it.
+
+    index = DeckIndex.from_parquet(game_modes=["Ladder"])
+    index.nearest(deck, k=10)          # [(Deck, jaccard, times played, wins)]
+
+Archetypes are named card cores, looked up through the cards() catalogue:
+
+    archetypes = Archetypes.from_names(ARCHETYPES, catalogue, codec)
+    archetypes.classify(deck)          # 'log bait'
+"""
+
+# Cores a deck must mostly contain to count as the archetype.
+ARCHETYPES = {
+    "log bait": ["Goblin Barrel", "Princess", "The Log", "Goblin Gang", "Knight", "Inferno Tower", "Rocket"],
+    "hog cycle": ["Hog Rider", "Ice Spirit", "Skeletons", "Cannon", "Musketeer", "Ice Golem", "Fireball", "The Log"],
+    "golem beatdown": ["Golem", "Night Witch", "Baby Dragon", "Lumberjack", "Lightning", "Tornado"],
+    "x-bow": ["X-Bow", "Tesla", "Archers", "Ice Spirit", "Skeletons", "Knight", "Fireball", "The Log"],
+    "graveyard": ["Graveyard", "Poison", "Ice Wizard", "Baby Dragon", "Tornado", "Knight", "Barbarian Barrel"],
+    "lavaloon": ["Lava Hound", "Balloon", "Mega Minion", "Minions", "Skeleton Dragons", "Fireball", "Tombstone"],
+    "miner control": ["Miner", "Poison", "Wall Breakers", "Bomb Tower", "Bats", "Spear Goblins", "The Log"],
+}
+
+WORDS = (EMPTY + 1) // 64  # uint64 words per bitset
+SIGNATURE_CHUNK = 50_000  # decks hashed at once, bounds the (bands * rows, chunk, 8) temporary
+
+
+def bitsets(codes):
+    """(n, 8) card codes -> (n, 4) uint64 bitsets, EMPTY slots ignored."""
+    codes = np.asarray(codes, dtype=np.int64)
+    bits = np.zeros((len(codes), WORDS), dtype=np.uint64)
+    rows, slots = np.nonzero(codes != EMPTY)
+    values = codes[rows, slots]
+    np.bitwise_or.at(bits, (rows, values >> 6), np.uint64(1) << (values & 63).astype(np.uint64))
+    return bits
+
+
+class DeckIndex:
+    """
+    Args:
+        codes (array): (n, 8) card codes of the decks to index (repeats are counted, not stored twice).
+        won (array, optional): (n,) booleans, whether each deck won.
+        bands (int): LSH bands. More bands find more (and less similar) candidates.
+        rows (int): MinHash values per band.
+        seed (int): Seed of the MinHash permutations, fixed so signatures are reproducible.
+    """
+
+    def __init__(self, codes, won=None, bands=16, rows=2, seed=0):
+        keys = pack(codes) if len(codes) else np.zeros(0, dtype=np.uint64)
+        self.keys, inverse, self.counts = np.unique(keys, return_inverse=True, return_counts=True)
+        self.wins = np.bincount(inverse, weights=np.asarray(won, dtype=np.float64), minlength=len(self.keys)).astype(np.int64) if won is not None else np.zeros(len(self.keys), dtype=np.int64)
+
+        self.codes = unpack(self.keys)
+        self.bits = bitsets(self.codes)
+        self.sizes = (self.codes != EMPTY).sum(axis=1)
+
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        # one random permutation of the card codes per hash function; EMPTY never wins the min
+        self.permutations = np.stack([rng.permutation(EMPTY + 1) for _ in range(bands * rows)]).astype(np.int16)
+        self.permutations[:, EMPTY] = EMPTY + 1
+        self.band_keys = []
+        self.band_order = []
+        signatures = self.signatures(self.codes)
+        for band in range(bands):
+            band_key = self._band_key(signatures, band)
+            order = np.argsort(band_key, kind="stable")
+            self.band_order.append(order)
+            self.band_keys.append(band_key[order])
+
+    @classmethod
+    def from_decks(cls, decks, won=None, **kwargs):
+        return cls(codes_array([deck.codes for deck in decks]), won, **kwargs)
+
+    @classmethod
+    def from_parquet(cls, path=None, dates=None, game_modes=None, trophies=None, **kwargs):
+        """Index every deck in the Parquet export (see export.py)."""
+        codes, won = load_decks(path, dates, game_modes, trophies)
+        return cls(codes, won, **kwargs)
+
+    def signatures(self, codes, chunk_size=SIGNATURE_CHUNK):
+        """(n, 8) card codes -> (n, bands * rows) int16 MinHash signatures, chunk_size decks at a time."""
+        codes = np.asarray(codes)
+        signatures = np.empty((len(codes), len(self.permutations)), dtype=np.int16)
+        for start in range(0, len(codes), chunk_size):
+            chunk = codes[start:start + chunk_size].astype(np.intp)
+            signatures[start:start + chunk_size] = self.permutations[:, chunk].min(axis=2).T
+        return signatures
+
+    def _band_key(self, signatures, band):
+        key = np.zeros(len(signatures), dtype=np.uint64)
+        for value in signatures[:, band * self.rows:(band + 1) * self.rows].T:
+            key = (key << np.uint64(9)) | value.astype(np.uint64)
+        return key
+
+    def candidates(self, codes):
+        """Rows sharing at least one LSH band with the deck."""
+        signature = self.signatures(np.asarray(codes).reshape(1, -1))
+        found = []
+        for band in range(self.bands):
+            key = self._band_key(signature, band)[0]
+            keys = self.band_keys[band]
+            start, end = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+            found.append(self.band_order[band][start:end])
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def jaccard(self, deck, rows=None):
+        """Exact Jaccard similarity of deck against the given rows (all decks by default)."""
+        rows = np.arange(len(self.keys)) if rows is None else rows
+        bits = self.bits[rows]
+        common = np.zeros(len(rows), dtype=np.int64)
+        for code in deck.codes:
+            common += ((bits[:, code >> 6] >> np.uint64(code & 63)) & np.uint64(1)).astype(np.int64)
+        return common / (self.sizes[rows] + len(deck) - common)
+
+    def nearest(self, deck, k=10, exact=False, min_count=1):
+        """
+        The k indexed decks most similar to deck, as [(Deck, jaccard, times played, wins)].
+
+        With exact=True every deck is scored instead of only the LSH candidates.
+        """
+        codes = deck.codes + (EMPTY,) * (8 - len(deck))
+        rows = np.arange(len(self.keys)) if exact else self.candidates(codes)
+        rows = rows[self.counts[rows] >= min_count]
+        if not len(rows):
+            return []
+        scores = self.jaccard(deck, rows)
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [
+            (Deck.from_key(int(self.keys[rows[i]])), float(scores[i]), int(self.counts[rows[i]]), int(self.wins[rows[i]]))
+            for i in best
+        ]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class Archetypes:
+    """
+    Args:
+        cores (dict): Archetype name -> list of card codes.
+    """
+
+    def __init__(self, cores):
+        self.names = list(cores)
+        self.cores = [Deck(sorted(set(codes))) for codes in cores.values()]
+
+    @classmethod
+    def from_names(cls, archetypes, catalogue, codec):
+        """Resolve card names through the catalogue (built from cards(), so cards have ids)."""
+        cores = {}
+        for name, cards in archetypes.items():
+            codes = []
+            for card_name in cards:
+                card = catalogue.get(card_name)
+                if card is None or card.get("id") is None:
+                    print(f"Unknown card {card_name!r} in archetype {name!r}")
+                    continue
+                codes.append(codec.encode(card["id"]))
+            cores[name] = codes
+        return cls(cores)
+
+    def scores(self, deck):
+        """Share of each archetype's core that the deck contains."""
+        return {name: deck.overlap(core) / len(core) for name, core in zip(self.names, self.cores) if len(core)}
+
+    def classify(self, deck, threshold=0.5):
+        """Best matching archetype name, or None when no core is at least threshold covered."""
+        scores = self.scores(deck)
+        if not scores:
+            return None
+        name = max(scores, key=scores.get)
+        return name if scores[name] >= threshold else None
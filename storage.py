@@ -0,0 +1,313 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+Storage backends for the data layer.
+
+data.py talks to a Backend instead of to MySQL directly, so the same loaders
+run against the local MySQL server or an embedded SQLite file:
+
+    CR_STORAGE=sqlite python data.py
+
+Queries are written MySQL-style ("%s" placeholders, INSERT IGNORE) and
+passed through backend.sql(), which rewrites them for SQLite.
+"""
+
+user = "root"
+password = ""
+dbName = "clashroyale"
+
+sqlite_path = "data/clashroyale.sqlite3"
+
+CARD_TYPES = ["antiair", "antitank", "bigspell", "cheapantiair", "distractions", "minitank", "smallspell", "tanksupport", "wincon"]
+
+
+class Backend:
+    name = None
+    paramstyle = "%s"
+
+    def connection(self):
+        """Context manager yielding a connection; commits on success, rolls back on error."""
+        raise NotImplementedError
+
+    def sql(self, query):
+        return query
+
+    def schema(self):
+        """CREATE statements for every table and index."""
+        raise NotImplementedError
+
+    def create_schema(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            for statement in self.schema():
+                cursor.execute(statement)
+            cursor.close()
+
+    def close(self):
+        pass
+
+
+class MySQLBackend(Backend):
+    """
+    Pooled connections to the local MySQL server.
+
+    Args:
+        pool_size (int): Connections kept in the pool (CR_DB_POOL_SIZE).
+        timeout (float): Seconds to wait for a free connection when all are checked out.
+    """
+    name = "mysql"
+
+    def __init__(self, pool_size=None, timeout=10, **options):
+        import mysql.connector
+        import mysql.connector.pooling
+        self.mysql = mysql.connector
+        self.timeout = timeout
+        self.pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name="clashroyale",
+            pool_size=pool_size or int(os.environ.get("CR_DB_POOL_SIZE", 5)),
+            pool_reset_session=True,
+            **dict(dict(
+                host="localhost",
+                port=3306,  # Default MySQL port
+                database=dbName,
+                user=user,
+                password=password), **options))
+
+    def connect(self):
+        """
+        Check a connection out of the pool, waiting for one to be returned when
+        all of them are in use. Closing the connection hands it back.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                conn = self.pool.get_connection()
+                break
+            except self.mysql.errors.PoolError:
+                if time.monotonic() > deadline:
+                    print("Error connecting to MySQL: connection pool exhausted")
+                    return None
+                time.sleep(0.05)
+            except self.mysql.Error as err:
+                print(f"Error connecting to MySQL: {err}")
+                return None
+
+        # health check: reconnect connections the server has dropped while they sat in the pool
+        try:
+            conn.ping(reconnect=True, attempts=2, delay=0)
+        except self.mysql.Error as err:
+            conn.close()
+            print(f"Error connecting to MySQL: {err}")
+            return None
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self.connect()
+        if conn is None:
+            raise self.mysql.errors.PoolError("No database connection available")
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def schema(self):
+        statements = [
+            """CREATE TABLE IF NOT EXISTS card (
+                card_id INT AUTO_INCREMENT PRIMARY KEY,
+                card_name VARCHAR(64) NOT NULL UNIQUE
+            )""",
+            """CREATE TABLE IF NOT EXISTS tripple_draft_stats (
+                card_id INT PRIMARY KEY,
+                ranking DOUBLE, rating DOUBLE, `usage` DOUBLE, usage_delta DOUBLE,
+                win DOUBLE, win_delta DOUBLE, cwr DOUBLE,
+                FOREIGN KEY (card_id) REFERENCES card (card_id)
+            )""",
+            # battle_id is the battle's fingerprint (see battles.py), not a counter
+            """CREATE TABLE IF NOT EXISTS battle (
+                battle_id BIGINT PRIMARY KEY,
+                battle_time CHAR(20) NOT NULL,
+                game_mode VARCHAR(64),
+                type VARCHAR(64),
+                INDEX battle_time_idx (battle_time)
+            )""",
+            # battles claimed by an export run (export.py), done once its Parquet files are written
+            """CREATE TABLE IF NOT EXISTS battle_export (
+                battle_id BIGINT PRIMARY KEY,
+                run BIGINT NOT NULL,
+                done TINYINT NOT NULL DEFAULT 0,
+                INDEX battle_export_run_idx (run)
+            )""",
+            """CREATE TABLE IF NOT EXISTS participant (
+                battle_id BIGINT NOT NULL,
+                player_tag VARCHAR(16) NOT NULL,
+                team TINYINT NOT NULL,
+                crowns TINYINT,
+                trophies INT,
+                trophy_change INT,
+                PRIMARY KEY (battle_id, player_tag),
+                INDEX participant_player_tag_idx (player_tag)
+            )""",
+            # card_id here is the API card id (e.g. 26000000), not card.card_id
+            """CREATE TABLE IF NOT EXISTS deck_card (
+                battle_id BIGINT NOT NULL,
+                player_tag VARCHAR(16) NOT NULL,
+                slot TINYINT NOT NULL,
+                card_id INT NOT NULL,
+                level TINYINT,
+                evolution_level TINYINT,
+                PRIMARY KEY (battle_id, player_tag, slot),
+                INDEX deck_card_card_id_idx (card_id)
+            )""",
+        ]
+        statements += [
+            f"CREATE TABLE IF NOT EXISTS {table} (card_name VARCHAR(64) PRIMARY KEY)"
+            for table in CARD_TYPES
+        ]
+        return statements
+
+
+class SQLiteBackend(Backend):
+    """
+    Embedded SQLite store in WAL mode, one connection per thread.
+
+    Statements are parameterised and sqlite3 keeps the last cached_statements
+    of them prepared, so repeated inserts skip re-parsing.
+
+    Args:
+        path (str): Database file (CR_SQLITE_PATH). ':memory:' gives a throwaway
+            store, private to each thread.
+    """
+    name = "sqlite"
+    paramstyle = "?"
+
+    def __init__(self, path=None, cached_statements=256):
+        self.path = path or os.environ.get("CR_SQLITE_PATH", sqlite_path)
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.cached_statements = cached_statements
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, cached_statements=self.cached_statements, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self.connect()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def sql(self, query):
+        return query.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE")
+
+    def schema(self):
+        statements = [
+            """CREATE TABLE IF NOT EXISTS card (
+                card_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                card_name TEXT NOT NULL UNIQUE
+            )""",
+            """CREATE TABLE IF NOT EXISTS tripple_draft_stats (
+                card_id INTEGER PRIMARY KEY REFERENCES card (card_id),
+                ranking REAL, rating REAL, `usage` REAL, usage_delta REAL,
+                win REAL, win_delta REAL, cwr REAL
+            )""",
+            # battle_id is the battle's fingerprint (see battles.py), not a counter
+            """CREATE TABLE IF NOT EXISTS battle (
+                battle_id INTEGER PRIMARY KEY,
+                battle_time TEXT NOT NULL,
+                game_mode TEXT,
+                type TEXT
+            )""",
+            "CREATE INDEX IF NOT EXISTS battle_time_idx ON battle (battle_time)",
+            # battles claimed by an export run (export.py), done once its Parquet files are written
+            """CREATE TABLE IF NOT EXISTS battle_export (
+                battle_id INTEGER PRIMARY KEY REFERENCES battle (battle_id),
+                run INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0
+            )""",
+            "CREATE INDEX IF NOT EXISTS battle_export_run_idx ON battle_export (run)",
+            """CREATE TABLE IF NOT EXISTS participant (
+                battle_id INTEGER NOT NULL REFERENCES battle (battle_id),
+                player_tag TEXT NOT NULL,
+                team INTEGER NOT NULL,
+                crowns INTEGER,
+                trophies INTEGER,
+                trophy_change INTEGER,
+                PRIMARY KEY (battle_id, player_tag)
+            )""",
+            "CREATE INDEX IF NOT EXISTS participant_player_tag_idx ON participant (player_tag)",
+            # card_id here is the API card id (e.g. 26000000), not card.card_id
+            """CREATE TABLE IF NOT EXISTS deck_card (
+                battle_id INTEGER NOT NULL REFERENCES battle (battle_id),
+                player_tag TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                card_id INTEGER NOT NULL,
+                level INTEGER,
+                evolution_level INTEGER,
+                PRIMARY KEY (battle_id, player_tag, slot)
+            )""",
+            "CREATE INDEX IF NOT EXISTS deck_card_card_id_idx ON deck_card (card_id)",
+        ]
+        statements += [
+            f"CREATE TABLE IF NOT EXISTS {table} (card_name TEXT PRIMARY KEY)"
+            for table in CARD_TYPES
+        ]
+        return statements
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    """
+    The configured backend, created on first use. CR_STORAGE picks it
+    ('mysql' by default, or 'sqlite').
+    """
+    global _backend
+    if _backend is None:
+        _backend = BACKENDS[os.environ.get("CR_STORAGE", "mysql")]()
+    return _backend
+
+
+def set_backend(backend):
+    """Use a specific backend instance (e.g. SQLiteBackend(':memory:') in a notebook)."""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+    return backend
@@ -0,0 +1,186 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from API.players import battle_logs
+
+"""
+Incremental battle-log sync.
+
+The API only keeps a player's last ~25 battles, so every poll returns mostly
+games we have already seen. SyncEngine stores a high-water mark (the newest
+battleTime ingested) per player, hands only newer battles to the ingest
+callback, and estimates how often each player plays so the next poll can be
+scheduled before their 25-battle window rolls over.
+
+    engine = SyncEngine(token, ingest=lambda tag, battles: ...)
+    engine.track(["#820GP2VQ", "#C00Y2PJ9"])
+    for tag in engine.due():
+        engine.sync(tag)
+"""
+
+state_path = "data/sync.sqlite3"
+
+BATTLE_LOG_SIZE = 25
+BATTLE_TIME_FORMAT = "%Y%m%dT%H%M%S.%fZ"
+
+
+def parse_battle_time(value):
+    """'20250408T201512.000Z' -> unix timestamp"""
+    return datetime.strptime(value, BATTLE_TIME_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+
+
+class PlayerState:
+    __slots__ = ("tag", "last_battle", "last_poll", "next_poll", "rate", "battles", "polls", "overflows")
+
+    def __init__(self, tag, last_battle=None, last_poll=None, next_poll=0.0, rate=None, battles=0, polls=0, overflows=0):
+        self.tag = tag
+        self.last_battle = last_battle  # newest battleTime ingested, as returned by the API
+        self.last_poll = last_poll
+        self.next_poll = next_poll
+        self.rate = rate                # estimated battles per second
+        self.battles = battles
+        self.polls = polls
+        self.overflows = overflows      # polls where every returned battle was new (games may be lost)
+
+
+class SyncEngine:
+    """
+    Args:
+        token (str or KeyPool): API token.
+        path (str): SQLite file holding the per-player sync state.
+        ingest (function, optional): Called as ingest(tag, battles) with only the new battles, oldest first.
+        fill (float): Fraction of the 25-battle window we aim to have filled when polling again.
+        min_interval (float): Never poll a player more often than this (seconds).
+        max_interval (float): Poll even dormant players at least this often (seconds).
+    """
+
+    def __init__(self, token, path=state_path, ingest=None, fill=0.5, min_interval=5 * 60, max_interval=24 * 60 * 60):
+        self.token = token
+        self.ingest = ingest
+        self.fill = fill
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS player_sync (
+                tag TEXT PRIMARY KEY,
+                last_battle TEXT,
+                last_poll REAL,
+                next_poll REAL NOT NULL,
+                rate REAL,
+                battles INTEGER NOT NULL,
+                polls INTEGER NOT NULL,
+                overflows INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS player_sync_next_poll ON player_sync (next_poll)")
+        self.conn.commit()
+
+    def track(self, tags):
+        """Start tracking tags (already tracked ones keep their state). New tags are due immediately."""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO player_sync (tag, next_poll, battles, polls, overflows) VALUES (?, 0, 0, 0, 0)",
+                [(tag,) for tag in tags]
+            )
+            self.conn.commit()
+
+    def state(self, tag):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT tag, last_battle, last_poll, next_poll, rate, battles, polls, overflows FROM player_sync WHERE tag = ?",
+                [tag]
+            ).fetchone()
+        return PlayerState(*row) if row else PlayerState(tag)
+
+    def save(self, state):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO player_sync VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [state.tag, state.last_battle, state.last_poll, state.next_poll,
+                 state.rate, state.battles, state.polls, state.overflows]
+            )
+            self.conn.commit()
+
+    def due(self, now=None, limit=None):
+        """Tags whose next poll time has passed, most overdue first."""
+        now = time.time() if now is None else now
+        sql = "SELECT tag FROM player_sync WHERE next_poll <= ? ORDER BY next_poll"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            return [row[0] for row in self.conn.execute(sql, [now])]
+
+    def new_battles(self, state, logs):
+        """Battles newer than the player's high-water mark, oldest first."""
+        # battleTime is fixed-width UTC, so string comparison orders correctly.
+        battles = [log for log in logs if state.last_battle is None or log["battleTime"] > state.last_battle]
+        battles.sort(key=lambda log: log["battleTime"])
+        return battles
+
+    def update_rate(self, state, battles, logs, now):
+        """Blend this poll's observed battles/second into the player's estimate."""
+        if state.last_poll is not None:
+            observed = len(battles) / max(now - state.last_poll, 1.0)
+        elif len(logs) > 1:
+            times = sorted(parse_battle_time(log["battleTime"]) for log in logs)
+            observed = (len(times) - 1) / max(now - times[0], 1.0)
+        else:
+            observed = 0.0
+        state.rate = observed if state.rate is None else 0.3 * observed + 0.7 * state.rate
+
+    def next_interval(self, state, overflowed):
+        if overflowed:
+            # The whole window was new: we may have missed games, come back sooner.
+            return self.min_interval
+        if not state.rate:
+            return self.max_interval
+        interval = self.fill * BATTLE_LOG_SIZE / state.rate
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def sync(self, tag, now=None):
+        """
+        Poll one player and ingest their new battles.
+
+        Returns the list of new battles (oldest first), or None if the request failed.
+        """
+        state = self.state(tag)
+        logs = battle_logs(self.token, tag)
+        now = time.time() if now is None else now
+        if logs is None:
+            # Keep the state but don't hammer a failing tag.
+            state.next_poll = now + self.min_interval
+            self.save(state)
+            return None
+
+        battles = self.new_battles(state, logs)
+        overflowed = state.last_battle is not None and len(battles) >= min(len(logs), BATTLE_LOG_SIZE) > 0
+        self.update_rate(state, battles, logs, now)
+
+        if battles:
+            if self.ingest:
+                self.ingest(tag, battles)
+            state.last_battle = battles[-1]["battleTime"]
+        state.battles += len(battles)
+        state.polls += 1
+        state.overflows += overflowed
+        state.last_poll = now
+        state.next_poll = now + self.next_interval(state, overflowed)
+        self.save(state)
+        return battles
+
+    def run_due(self, now=None, limit=None):
+        """Sync every player that is due. Returns the number of new battles ingested."""
+        total = 0
+        for tag in self.due(now, limit):
+            battles = self.sync(tag)
+            total += len(battles or [])
+        return total
+
+    def close(self):
+        self.conn.close()